@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+
+from timing import percentiles, time_each, peak_rss_mb
+from feature_store import load_dataset
+from compiled_forest import export_forest, CompiledForest, load_model_from_pickle
+
+STAGES = ['decode', 'cvtcolor', 'hands', 'features', 'predict', 'predict_batch',
+          'predict_compiled', 'end_to_end']
+
+
+def bench_classifier(model, X, batch_size, results):
+    rows = [X[i:i + 1] for i in range(len(X))]
+    results['predict'] = percentiles(time_each(model.predict, rows))
+
+    batches = [X[i:i + batch_size] for i in range(0, len(X), batch_size)]
+    samples = time_each(model.predict, batches)
+    results['predict_batch'] = percentiles(samples, count=len(X))
+    results['predict_batch']['batch_size'] = batch_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.npz')
+        export_forest(model, path)
+        compiled = CompiledForest(path)
+    results['predict_compiled'] = percentiles(time_each(compiled.predict, rows))
+
+
+def bench_detection(model, image_dir, limit, stages, results):
+    import cv2
+    from create_dataset import list_images, create_hands
+    from features import hands_to_array, model_spec, spec_features
+
+    items = list_images(image_dir)
+    step = max(1, len(items) // limit)
+    paths = [path for path, _ in items[::step][:limit]]
+    spec = model_spec(model)
+
+    images = [cv2.imread(path) for path in paths]
+    rgb = [cv2.cvtColor(img, cv2.COLOR_BGR2RGB) for img in images]
+    if 'decode' in stages:
+        results['decode'] = percentiles(time_each(cv2.imread, paths))
+    if 'cvtcolor' in stages:
+        results['cvtcolor'] = percentiles(time_each(lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2RGB), images))
+
+    hands = create_hands()
+    detections = [hands.process(img).multi_hand_landmarks for img in rgb]
+    if 'hands' in stages:
+        results['hands'] = percentiles(time_each(hands.process, rgb))
+    found = [landmarks for landmarks in detections if landmarks]
+    if 'features' in stages and found:
+        results['features'] = percentiles(
+            time_each(lambda landmarks: spec_features(hands_to_array(landmarks), spec), found))
+
+    def end_to_end(path):
+        img_rgb = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+        landmarks = hands.process(img_rgb).multi_hand_landmarks
+        if landmarks:
+            features = spec_features(hands_to_array(landmarks), spec)
+            if features is not None:
+                model.predict(features[None, :])
+
+    if 'end_to_end' in stages:
+        results['end_to_end'] = percentiles(time_each(end_to_end, paths))
+    hands.close()
+    return round(len(found) / max(len(detections), 1), 3)
+
+
+def compare(current, baseline, tolerance):
+    """Return a list of regressions where p50/p95 grew by more than tolerance"""
+    regressions = []
+    for stage, stats in baseline.get('stages', {}).items():
+        now = current['stages'].get(stage)
+        if now is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if stats.get(key) and now[key] > stats[key] * (1 + tolerance):
+                regressions.append(f"{stage} {key}: {stats[key]} -> {now[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the detection and classification hot paths")
+    parser.add_argument('--model', default='modelwords.p')
+    parser.add_argument('--data', default='datawords.pickle', help="Feature vectors for the classifier stages")
+    parser.add_argument('--images', default='datawords', help="Image directory for the detection stages")
+    parser.add_argument('--limit', type=int, default=200, help="Max images / feature vectors to time")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous --output file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative slowdown before a stage counts as a regression")
+    args = parser.parse_args()
+
+    model = load_model_from_pickle(args.model)
+    X, _, _ = load_dataset(args.data)
+    X = np.ascontiguousarray(X[:args.limit], dtype=np.float32)
+
+    stages = {}
+    detection_rate = None
+    started = time.perf_counter()
+    if {'predict', 'predict_batch', 'predict_compiled'} & set(args.stages):
+        bench_classifier(model, X, args.batch_size, stages)
+    if {'decode', 'cvtcolor', 'hands', 'features', 'end_to_end'} & set(args.stages):
+        detection_rate = bench_detection(model, args.images, args.limit, args.stages, stages)
+    stages = {name: stats for name, stats in stages.items() if name in args.stages}
+
+    report = {
+        'model': args.model,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'wall_s': round(time.perf_counter() - started, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'hand_detection_rate': detection_rate,
+        'stages': stages,
+    }
+
+    for name, stats in stages.items():
+        print(f"{name:18s} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+              f"p99 {stats['p99_ms']:9.3f} ms  {stats['throughput_per_s']} /s")
+    print(f"peak RSS {report['peak_rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import os
+import argparse
 import cv2
 
+from image_writer import ImageWriter
+from landmark_collector import LandmarkCollector
+from features import hands_to_array
+
 # Map numbers to letters for easier reference
 LETTER_MAP = {str(i): chr(65 + i) for i in range(26)}  # 0->A, 1->B, etc.
 
@@ -12,11 +17,34 @@ number_of_classes = 26
 dataset_size = 100
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect webcam images for one letter")
+    parser.add_argument('--quality', type=int, default=95, help="JPEG quality (0-100)")
+    parser.add_argument('--writers', type=int, default=2, help="Background encoder/writer threads")
+    parser.add_argument('--shard', action='store_true',
+                        help="Append images to data/<class>.tar instead of one file each")
+    parser.add_argument('--gate', action='store_true',
+                        help="Only keep sharp, confidently detected, non-duplicate hand poses "
+                             "and store their landmarks next to each image")
+    parser.add_argument('--landmarks-only', metavar='STORE', default=None,
+                        help="Save no images: append landmark features to this FeatureStore directory")
+    parser.add_argument('--thumbnail-size', type=int, default=0,
+                        help="With --landmarks-only, also keep a JPEG thumbnail of this many pixels per sample")
+    args = parser.parse_args()
+
     cap = cv2.VideoCapture(0)  # Back to camera index 0
     if not cap.isOpened():
         print("Error: Could not open webcam")
         return
 
+    tracker = gate = None
+    if args.gate or args.landmarks_only:
+        # Imported here so plain collection doesn't need mediapipe
+        from tracking import HandTracker
+        tracker = HandTracker(max_num_hands=1)
+    if args.gate:
+        from quality_gate import QualityGate
+        gate = QualityGate()
+
     # Get the class number from user
     print("\nEnter the number for the letter you want to collect:")
     print("\n".join([f"{num}: {letter}" for num, letter in LETTER_MAP.items()]))
@@ -57,32 +85,63 @@ def main():
                 cv2.destroyAllWindows()
                 return
         
-        # Collect images
+        # Collect images (or only landmarks); encoding and disk writes happen on background threads
         counter = 0
-        while counter < dataset_size:
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Could not read frame")
-                break
+        if args.landmarks_only:
+            writer = LandmarkCollector(args.landmarks_only, thumbnail_size=args.thumbnail_size)
+        else:
+            writer = ImageWriter(DATA_DIR, args.quality, args.writers, shard=args.shard)
+        with writer:
+            while counter < dataset_size:
+                ret, frame = cap.read()
+                if not ret:
+                    print("Error: Could not read frame")
+                    break
                 
-            cv2.putText(frame, f'Collecting {LETTER_MAP[str(j)]}: {counter}/{dataset_size}', 
-                        (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2, cv2.LINE_AA)
-            cv2.imshow('Collect Images', frame)
-            
-            # Save the image
-            cv2.imwrite(os.path.join(folder_path, f'{counter}.jpg'), frame)
-            counter += 1
+                # Save the image before drawing the overlay on it
+                reason = None
+                if tracker is None:
+                    writer.put(frame, j, f'{counter}.jpg')
+                    counter += 1
+                else:
+                    results = tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                    if gate is not None:
+                        accepted, reason, hands = gate.check(frame, results)
+                    else:
+                        hands = hands_to_array(results.multi_hand_landmarks, 1)
+                        accepted = len(hands) > 0
+                    if accepted and args.landmarks_only:
+                        accepted = writer.add(frame, j, hands)
+                    elif accepted:
+                        writer.put(frame, j, f'{counter}.jpg', landmarks=hands)
+                    counter += int(accepted)
+                
+                cv2.putText(frame, f'Collecting {LETTER_MAP[str(j)]}: {counter}/{dataset_size}', 
+                            (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2, cv2.LINE_AA)
+                cv2.putText(frame, writer.summary(), (50, 90),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1, cv2.LINE_AA)
+                if gate is not None:
+                    color = (0, 255, 0) if reason == 'accepted' else (0, 0, 255)
+                    cv2.putText(frame, f'{reason.replace("_", " ")} | {gate.summary()}', (50, 120),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+                cv2.imshow('Collect Images', frame)
+                cv2.waitKey(1)
             
-            # Small delay to not overwhelm the system
-            cv2.waitKey(25)
+            print("Waiting for pending writes...")
+        print(writer.summary())
+        if gate is not None:
+            print(gate.summary())
         
-        print(f"\nFinished collecting {dataset_size} images for letter {LETTER_MAP[str(j)]}")
+        print(f"\nFinished collecting {counter} {'samples' if args.landmarks_only else 'images'} "
+              f"for letter {LETTER_MAP[str(j)]}")
         
     except KeyboardInterrupt:
         print("\nCollection interrupted by user")
     except Exception as e:
         print(f"An error occurred: {str(e)}")
     finally:
+        if tracker is not None:
+            tracker.close()
         cap.release()
         cv2.destroyAllWindows()
 
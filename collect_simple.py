@@ -2,6 +2,9 @@ import os
 import cv2
 import time
 import sys
+import argparse
+
+from image_writer import ImageWriter
 
 # Create data directory if it doesn't exist
 DATA_DIR = './data'
@@ -27,7 +30,7 @@ def get_user_input():
             print("\nExiting program.")
             sys.exit(0)
 
-def collect_images():
+def collect_images(quality=95, shard=False, gate=None):
     print("Starting webcam...")
     cap = cv2.VideoCapture(0)
     
@@ -38,6 +41,7 @@ def collect_images():
     # Wait a moment for the camera to initialize
     time.sleep(1)
     
+    tracker = None
     try:
         # Get the letter number with error handling
         number = get_user_input()
@@ -71,35 +75,69 @@ def collect_images():
                 print("\nCancelled by user")
                 return
         
-        # Collect 100 images
+        # Collect 100 images; the writer encodes and saves them in the background
         print("\nCollecting images... Keep your hand steady!")
-        for i in range(100):
-            ret, frame = cap.read()
-            if not ret:
-                print("Error reading from webcam")
-                return
-            
-            # Save the image
-            image_path = os.path.join(letter_dir, f"{i}.jpg")
-            cv2.imwrite(image_path, frame)
-            
-            # Show progress
-            cv2.putText(frame, f"Collecting {letter}: {i+1}/100", 
-                      (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.imshow('Camera', frame)
-            
-            # Check for ESC key
-            if cv2.waitKey(1) & 0xFF == 27:
-                print("\nCollection interrupted by user")
-                return
+        if gate is not None:
+            from tracking import HandTracker
+            tracker = HandTracker(max_num_hands=1)
+        with ImageWriter(DATA_DIR, quality, shard=shard) as writer:
+            i = 0
+            while i < 100:
+                ret, frame = cap.read()
+                if not ret:
+                    print("Error reading from webcam")
+                    return
+                
+                # Save the image; with a quality gate only frames it accepts count
+                if gate is None:
+                    writer.put(frame, number, f"{i}.jpg")
+                    i += 1
+                else:
+                    results = tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                    accepted, reason, hands = gate.check(frame, results)
+                    if accepted:
+                        writer.put(frame, number, f"{i}.jpg", landmarks=hands)
+                        i += 1
+                
+                # Show progress
+                cv2.putText(frame, f"Collecting {letter}: {i}/100", 
+                          (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.putText(frame, writer.summary(), (50, 90),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+                if gate is not None:
+                    cv2.putText(frame, gate.summary(), (50, 120),
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+                cv2.imshow('Camera', frame)
+                
+                # Check for ESC key
+                if cv2.waitKey(1) & 0xFF == 27:
+                    print("\nCollection interrupted by user")
+                    return
+        print(writer.summary())
+        if gate is not None:
+            print(gate.summary())
             
         print(f"\nDone! Collected 100 images for letter {letter}")
         
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
     finally:
+        if tracker is not None:
+            tracker.close()
         cap.release()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    collect_images()
+    parser = argparse.ArgumentParser(description="Collect 100 webcam images for one letter")
+    parser.add_argument('--quality', type=int, default=95, help="JPEG quality (0-100)")
+    parser.add_argument('--shard', action='store_true',
+                        help="Append images to data/<class>.tar instead of one file each")
+    parser.add_argument('--gate', action='store_true',
+                        help="Only keep sharp, confidently detected, non-duplicate hand poses "
+                             "and store their landmarks next to each image")
+    args = parser.parse_args()
+    gate = None
+    if args.gate:
+        from quality_gate import QualityGate
+        gate = QualityGate()
+    collect_images(args.quality, args.shard, gate)
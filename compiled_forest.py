@@ -0,0 +1,129 @@
+import sys
+import pickle
+
+import numpy as np
+
+from features import attach_spec, spec_to_json, spec_from_json
+
+COMPILED_VERSION = 1
+
+
+def export_forest(model, path, spec=None):
+    """Flatten a fitted RandomForestClassifier into contiguous node arrays (.npz).
+
+    The model's feature/label spec (features.make_spec) is stored alongside as
+    JSON; by default the one a loader attached to the model.
+    """
+    spec = spec or getattr(model, 'feature_spec_', None)
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        leaf = left == -1
+        # Children become global node indices; leaves point at themselves
+        own = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+        lefts.append(np.where(leaf, own, left + offset))
+        rights.append(np.where(leaf, own, right + offset))
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+
+        # Same per-leaf normalisation as DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(value / normalizer)
+
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    np.savez(path,
+             version=np.int32(COMPILED_VERSION),
+             feature=np.concatenate(features),
+             threshold=np.concatenate(thresholds),
+             left=np.concatenate(lefts),
+             right=np.concatenate(rights),
+             value=np.concatenate(values),
+             roots=np.asarray(roots, dtype=np.int32),
+             max_depth=np.int32(max_depth),
+             n_features=np.int32(model.n_features_in_),
+             classes=np.asarray(model.classes_),
+             spec=np.asarray(spec_to_json(spec) if spec else ''))
+
+
+class CompiledForest:
+    """Vectorised evaluator for a forest exported with export_forest.
+
+    Walks every tree for every sample at once, one depth level per step. It
+    needs only NumPy and exposes the same predict/predict_proba/classes_
+    surface as the sklearn model, so it drops into BatchPredictor unchanged.
+    Results match RandomForestClassifier.predict exactly: inputs are cast to
+    float32 like sklearn does and tree probabilities are summed in tree order.
+    """
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays['version']) != COMPILED_VERSION:
+                raise ValueError(f"Unsupported compiled model version in {path}")
+            self.feature = arrays['feature']
+            self.threshold = arrays['threshold']
+            self.left = arrays['left']
+            self.right = arrays['right']
+            self.value = arrays['value']
+            self.roots = arrays['roots']
+            self.max_depth = int(arrays['max_depth'])
+            self.n_features_in_ = int(arrays['n_features'])
+            self.classes_ = arrays['classes']
+            # Absent in files exported before specs were saved
+            self.feature_spec_ = spec_from_json(str(arrays['spec'])) if 'spec' in arrays.files else None
+
+    def apply(self, X):
+        """Leaf node index of every (sample, tree) pair"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, model expects {self.n_features_in_}")
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        leaf_values = self.value[self.apply(X)]  # (samples, trees, classes)
+        # cumsum accumulates sequentially, matching the forest's tree-by-tree sum
+        proba = np.cumsum(leaf_values, axis=1)[:, -1, :]
+        return proba / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def load_model_from_pickle(path):
+    """Pickled model with its validated spec attached as model.feature_spec_"""
+    with open(path, 'rb') as f:
+        model_dict = pickle.load(f)
+    # model.p stores {'model': ...}, modelwords.p stores {'modelwords': ...}
+    model = model_dict['model'] if 'model' in model_dict else next(iter(model_dict.values()))
+    return attach_spec(model, model_dict.get('spec'))
+
+
+def load_model(path):
+    """Load a compiled .npz forest or a pickled sklearn model, spec attached"""
+    if path.endswith('.npz'):
+        forest = CompiledForest(path)
+        return attach_spec(forest, forest.feature_spec_)
+    return load_model_from_pickle(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python compiled_forest.py <model.p> <model.npz>")
+        sys.exit(1)
+    export_forest(load_model_from_pickle(sys.argv[1]), sys.argv[2])
+    print(f"Exported {sys.argv[1]} to {sys.argv[2]}")
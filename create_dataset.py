@@ -1,52 +1,172 @@
 import os
 import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import mediapipe as mp
 import cv2
-import matplotlib.pyplot as plt
 
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
+from landmark_cache import LandmarkCache, CACHE_PATH
+from feature_store import FeatureStore
+from features import (extract_features, features_from_array, load_landmarks, feature_width, make_spec,
+                      parse_labels, MINSHIFT_XY, LANDMARKS_SUFFIX)
 
-hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+mp_hands = mp.solutions.hands
 
 DATA_DIR = './data'
+OUTPUT_PATH = 'data.pickle'
+
+# Each worker process owns its own MediaPipe graph (they are not picklable/shareable)
+_hands = None
+
+
+def _natural_key(name):
+    # Sort '2.jpg' before '10.jpg' so the output order is stable and human friendly
+    stem = os.path.splitext(name)[0]
+    return (0, int(stem), name) if stem.isdigit() else (1, 0, name)
+
+
+def list_images(data_dir):
+    """Return a deterministic list of (image_path, label) pairs under data_dir"""
+    items = []
+    for dir_ in sorted(os.listdir(data_dir), key=_natural_key):
+        dir_path = os.path.join(data_dir, dir_)
+        if os.path.isdir(dir_path):  # Check if it's a directory
+            for img_path in sorted(os.listdir(dir_path), key=_natural_key):
+                img_path_full = os.path.join(dir_path, img_path)
+                if img_path.endswith(LANDMARKS_SUFFIX):
+                    continue  # landmarks stored next to an image at collection time
+                if os.path.isfile(img_path_full):  # Ensure it's a file, not another directory
+                    items.append((img_path_full, dir_))
+    return items
+
+
+def create_hands():
+    return mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+
+
+def extract_landmarks(hands, img_path):
+    """Run hand detection on one image and return its feature vector, or None"""
+    img = cv2.imread(img_path)
+    if img is None:
+        return None
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    results = hands.process(img_rgb)
+    data_aux = extract_features(results.multi_hand_landmarks, MINSHIFT_XY)
+    return None if data_aux is None else data_aux.tolist()
+
+
+def _init_worker():
+    global _hands
+    _hands = create_hands()
+
+
+def _extract_in_worker(img_path):
+    return extract_landmarks(_hands, img_path)
+
+
+def _extract_all(paths, workers, chunk_size):
+    if not paths:
+        return []
+    if workers == 1:
+        hands = create_hands()
+        features = [extract_landmarks(hands, path) for path in paths]
+        hands.close()
+        return features
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(_extract_in_worker, paths, chunksize=chunk_size))
+
+
+def build_dataset(data_dir=DATA_DIR, workers=None, chunk_size=16, cache=None):
+    """Extract landmarks for every image under data_dir.
+
+    With more than one worker the images are distributed over a process pool in
+    chunks. Results are collected in input order, so data/labels come out the
+    same regardless of the worker count. When a LandmarkCache is given only new
+    or modified images are sent to MediaPipe; images with stored landmarks
+    (features.load_landmarks) never are.
+    """
+    items = list_images(data_dir)
+    paths = [path for path, _ in items]
+    workers = workers or os.cpu_count() or 1
+
+    features = [None] * len(paths)
+    todo = []
+    for index, path in enumerate(paths):
+        if cache is not None:
+            found, cached = cache.lookup(path)
+            if found:
+                features[index] = cached
+                continue
+        # Frames collected with the quality gate already carry their landmarks
+        hands = load_landmarks(path)
+        if hands is not None:
+            data_aux = features_from_array(hands, MINSHIFT_XY)
+            features[index] = None if data_aux is None else data_aux.tolist()
+            if cache is not None:
+                cache.store(path, features[index])
+            continue
+        todo.append(index)
+
+    extracted = _extract_all([paths[i] for i in todo], workers, chunk_size)
+    for index, data_aux in zip(todo, extracted):
+        features[index] = data_aux
+        if cache is not None:
+            cache.store(paths[index], data_aux)
+
+    if cache is not None:
+        cache.prune(paths)
+        cache.save()
+
+    data = []
+    labels = []
+    sources = []
+    for (path, label), data_aux in zip(items, features):
+        if data_aux is not None:
+            data.append(data_aux)
+            labels.append(label)
+            sources.append(path)
+    return data, labels, sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from collected images")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with one sub-folder per class")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="Where to write the pickled dataset")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of extraction processes (default: all cores, 1 = serial)")
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help="Images handed to a worker at a time")
+    parser.add_argument('--store', default=None,
+                        help="Write a FeatureStore directory instead of a pickle")
+    parser.add_argument('--cache', default=CACHE_PATH, help="Landmark cache file")
+    parser.add_argument('--no-cache', action='store_true', help="Re-extract every image")
+    parser.add_argument('--labels', type=parse_labels, default={},
+                        help="Text shown for each class folder, e.g. 0=A,1=B,2=L (default: 0..25 -> A..Z)")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else LandmarkCache(args.cache, kind='xy')
+    data, labels, sources = build_dataset(args.data_dir, args.workers, args.chunk_size, cache)
+    if cache is not None:
+        print(cache.report())
+
+    if not data:
+        print("No hands detected, nothing to save")
+        return
+    # Saved with the data so training and inference know how it was built
+    spec = make_spec(MINSHIFT_XY, len(data[0]) // feature_width(MINSHIFT_XY), set(labels), args.labels)
+
+    if args.store:
+        store = FeatureStore.create(args.store, len(data[0]), spec=spec)
+        store.append(data, labels, sources)
+        print(f"Saved {len(store)} samples to {args.store}")
+        return
+
+    with open(args.output, 'wb') as f:
+        pickle.dump({'data': data, 'labels': labels, 'spec': spec}, f)
+    print(f"Saved {len(data)} samples to {args.output}")
+
 
-data = []
-labels = []
-for dir_ in os.listdir(DATA_DIR):
-    dir_path = os.path.join(DATA_DIR, dir_)
-    if os.path.isdir(dir_path):  # Check if it's a directory
-        for img_path in os.listdir(dir_path):
-            img_path_full = os.path.join(dir_path, img_path)
-            if os.path.isfile(img_path_full):  # Ensure it's a file, not another directory
-                data_aux = []
-
-                x_ = []
-                y_ = []
-
-                img = cv2.imread(img_path_full)
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-                results = hands.process(img_rgb)
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        for i in range(len(hand_landmarks.landmark)):
-                            x = hand_landmarks.landmark[i].x
-                            y = hand_landmarks.landmark[i].y
-
-                            x_.append(x)
-                            y_.append(y)
-
-                        for i in range(len(hand_landmarks.landmark)):
-                            x = hand_landmarks.landmark[i].x
-                            y = hand_landmarks.landmark[i].y
-                            data_aux.append(x - min(x_))
-                            data_aux.append(y - min(y_))
-
-                    data.append(data_aux)
-                    labels.append(dir_)
-
-f = open('data.pickle', 'wb')
-pickle.dump({'data': data, 'labels': labels}, f)
-f.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import math
+from collections import deque
+
+import numpy as np
+
+# Shipped with the app, one word per line
+WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'words.txt')
+_END = '$'
+
+
+class Trie:
+    """Prefix tree of dictionary words, nodes are plain dicts"""
+
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self.root
+        for ch in word.upper():
+            node = node.setdefault(ch, {})
+        if _END not in node:
+            node[_END] = True
+            self.size += 1
+
+    @staticmethod
+    def child(node, ch):
+        return None if node is None else node.get(ch)
+
+    @staticmethod
+    def is_word(node):
+        return node is not None and _END in node
+
+
+def load_words(path=WORDS_PATH):
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip().isalpha()]
+
+
+class LetterStreamDecoder:
+    """Turns the per-frame letter probability stream into words and sentences.
+
+    A letter is committed once the same top letter has been held for
+    hold_frames frames with a mean confidence of at least min_confidence; it
+    can only be committed again after the hand changes letter or leaves the
+    frame. A gap of space_frames frames without a hand ends the word, and
+    sentence_frames ends the sentence. A word that reaches max_word_length
+    letters ends before the next letter, with the same 'word' event.
+
+    Each committed slot keeps its averaged letter distribution. A beam search
+    over the top_k letters of every slot, constrained by the dictionary trie
+    (out-of-dictionary prefixes are kept with a penalty), picks the most likely
+    spelling when the word ends. Per-frame work is O(letters); beam work only
+    happens on commits and words are capped at max_word_length, so memory
+    stays bounded (the transcript keeps the last max_sentences sentences).
+    """
+
+    def __init__(self, letters, words=None, hold_frames=8, min_confidence=0.4, space_frames=15,
+                 sentence_frames=45, beam_width=8, top_k=3, oov_penalty=4.0, max_word_length=24,
+                 max_sentences=100):
+        self.letters = list(letters)
+        self.trie = Trie(load_words() if words is None else words)
+        self.hold_frames = hold_frames
+        self.min_confidence = min_confidence
+        self.space_frames = space_frames
+        self.sentence_frames = sentence_frames
+        self.beam_width = beam_width
+        self.top_k = top_k
+        self.oov_penalty = oov_penalty
+        self.max_word_length = max_word_length
+
+        self.sentences = deque(maxlen=max_sentences)
+        self.words = []
+        self.raw_word = ''
+        self.beams = [(0.0, '', self.trie.root)]
+        self._held = None
+        self._held_frames = 0
+        self._held_sum = np.zeros(len(self.letters))
+        self._committed_held = False
+        self._blank_frames = 0
+
+    def update(self, proba=None):
+        """Feed one frame (a probability vector over letters, or None for no hand).
+
+        Pass classifier probabilities such as PredictionSmoother.mean_proba, not
+        vote fractions: a one-hot vector makes every other letter cost ~20 in
+        the beam, far more than oov_penalty, so the dictionary never wins.
+
+        Returns a list of ('letter' | 'word' | 'sentence', text) events.
+        """
+        events = []
+        if proba is None:
+            self._held = None
+            self._held_frames = 0
+            self._committed_held = False
+            self._blank_frames += 1
+            if self._blank_frames == self.space_frames and self.raw_word:
+                events.append(('word', self._end_word()))
+            if self._blank_frames == self.sentence_frames and self.words:
+                events.append(('sentence', self._end_sentence()))
+            return events
+
+        self._blank_frames = 0
+        proba = np.asarray(proba, dtype=np.float64)
+        best = int(proba.argmax())
+        if best != self._held:
+            self._held = best
+            self._held_frames = 0
+            self._held_sum[:] = 0.0
+            self._committed_held = False
+        self._held_frames += 1
+        self._held_sum += proba
+
+        if not self._committed_held and self._held_frames >= self.hold_frames:
+            mean = self._held_sum / self._held_frames
+            if mean[best] >= self.min_confidence:
+                self._committed_held = True
+                if len(self.raw_word) >= self.max_word_length:
+                    events.append(('word', self._end_word()))
+                events.append(('letter', self._commit(mean)))
+        return events
+
+    @property
+    def text(self):
+        current = ' '.join(self.words + ([self.current_word] if self.raw_word else []))
+        return ' '.join(list(self.sentences) + ([current] if current else []))
+
+    @property
+    def current_word(self):
+        return self.beams[0][1] if self.beams else self.raw_word
+
+    def flush(self):
+        """End the current word and sentence, returning the full text"""
+        if self.raw_word:
+            self._end_word()
+        if self.words:
+            self._end_sentence()
+        return self.text
+
+    def clear(self):
+        self.sentences.clear()
+        self.words = []
+        self._reset_word()
+
+    def _commit(self, mean):
+        letter = self.letters[int(mean.argmax())]
+        self.raw_word += letter
+
+        candidates = np.argsort(mean)[::-1][:self.top_k]
+        expanded = []
+        for score, prefix, node in self.beams:
+            for index in candidates:
+                ch = self.letters[int(index)]
+                step = math.log(max(mean[index], 1e-9))
+                next_node = Trie.child(node, ch)
+                if next_node is None and self.trie.size:
+                    step -= self.oov_penalty
+                expanded.append((score + step, prefix + ch, next_node))
+        expanded.sort(key=lambda beam: beam[0], reverse=True)
+        self.beams = expanded[:self.beam_width]
+        return letter
+
+    def _end_word(self):
+        word = self.raw_word
+        if self.trie.size:
+            complete = [beam for beam in self.beams if Trie.is_word(beam[2])]
+            if complete:
+                word = max(complete, key=lambda beam: beam[0])[1]
+            else:
+                word = self.beams[0][1]
+        self.words.append(word)
+        self._reset_word()
+        return word
+
+    def _end_sentence(self):
+        sentence = ' '.join(self.words)
+        self.sentences.append(sentence[:1].upper() + sentence[1:].lower() + '.')
+        self.words = []
+        return self.sentences[-1]
+
+    def _reset_word(self):
+        self.raw_word = ''
+        self.beams = [(0.0, '', self.trie.root)]
+
+
+if __name__ == "__main__":
+    # A held 'Y' that narrowly beats 'T' at the end of C-A-? is spelled as the dictionary word CAT
+    letters = [chr(65 + i) for i in range(26)]
+    decoder = LetterStreamDecoder(letters)
+
+    def frame(**proba):
+        row = np.full(len(letters), 0.001)
+        for letter, p in proba.items():
+            row[letters.index(letter)] = p
+        return row
+
+    for held in (frame(C=0.9), frame(A=0.9), frame(Y=0.48, T=0.45)):
+        for _ in range(decoder.hold_frames):
+            decoder.update(held)
+        decoder.update(None)
+    print(f"raw {decoder.raw_word!r} -> {decoder.flush()!r}")
+    assert decoder.text == 'Cat.', decoder.text
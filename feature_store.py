@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import pickle
+
+import numpy as np
+
+from features import check_spec, legacy_spec, same_features
+
+META_FILE = 'meta.json'
+FEATURES_FILE = 'features.f32'
+LABELS_FILE = 'labels.i16'
+PATHS_FILE = 'paths.txt'
+
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int16
+
+
+def _class_key(name):
+    return (0, int(name), name) if str(name).isdigit() else (1, 0, str(name))
+
+
+class FeatureStore:
+    """Columnar on-disk dataset of landmark feature vectors.
+
+    A store is a directory holding a raw float32 feature matrix, an int16 array
+    of class indices, one source path per line and a small JSON header with the
+    shape, class names and feature spec (features.make_spec). The arrays are opened with np.memmap, so loading a
+    store costs no parsing and no copies; appending only writes the new rows.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, META_FILE)) as f:
+            self.meta = json.load(f)
+
+    @classmethod
+    def create(cls, root, n_features, classes=(), spec=None):
+        os.makedirs(root, exist_ok=True)
+        for name in (FEATURES_FILE, LABELS_FILE, PATHS_FILE):
+            open(os.path.join(root, name), 'wb').close()
+        meta = {'version': 1, 'n_features': int(n_features), 'num_samples': 0,
+                'classes': [str(c) for c in classes]}
+        if spec is not None:
+            meta['spec'] = check_spec(spec, int(n_features))
+        cls._write_meta(root, meta)
+        return cls(root)
+
+    @classmethod
+    def open_or_create(cls, root, n_features, classes=(), spec=None):
+        if os.path.exists(os.path.join(root, META_FILE)):
+            store = cls(root)
+            if store.n_features != n_features:
+                raise ValueError(f"{root} holds {store.n_features}-dim features, got {n_features}")
+            if spec is not None and not same_features(store.spec, spec):
+                raise ValueError(f"{root} holds {store.spec['layout']} x{store.spec['max_hands']} features, "
+                                 f"got {spec['layout']} x{spec['max_hands']}")
+            return store
+        return cls.create(root, n_features, classes, spec)
+
+    @staticmethod
+    def _write_meta(root, meta):
+        tmp_path = os.path.join(root, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(root, META_FILE))
+
+    def __len__(self):
+        return self.meta['num_samples']
+
+    @property
+    def n_features(self):
+        return self.meta['n_features']
+
+    @property
+    def classes(self):
+        return self.meta['classes']
+
+    @property
+    def spec(self):
+        """Feature spec from the header, guessed from the width for older stores"""
+        if 'spec' in self.meta:
+            return check_spec(self.meta['spec'], self.n_features)
+        return legacy_spec(self.n_features, layout=self.meta.get('layout'))
+
+    @property
+    def layout(self):
+        return self.spec['layout']
+
+    @property
+    def features(self):
+        if len(self) == 0:
+            return np.empty((0, self.n_features), dtype=FEATURE_DTYPE)
+        return np.memmap(os.path.join(self.root, FEATURES_FILE), dtype=FEATURE_DTYPE, mode='r',
+                         shape=(len(self), self.n_features))
+
+    @property
+    def labels(self):
+        if len(self) == 0:
+            return np.empty(0, dtype=LABEL_DTYPE)
+        return np.memmap(os.path.join(self.root, LABELS_FILE), dtype=LABEL_DTYPE, mode='r',
+                         shape=(len(self),))
+
+    @property
+    def paths(self):
+        with open(os.path.join(self.root, PATHS_FILE), encoding='utf-8') as f:
+            return f.read().splitlines()[:len(self)]
+
+    def class_index(self, name):
+        name = str(name)
+        classes = self.meta['classes']
+        if name not in classes:
+            classes.append(name)
+        return classes.index(name)
+
+    def append(self, features, labels, paths=None):
+        """Append rows to the store. labels are class names (str or int)"""
+        features = np.ascontiguousarray(features, dtype=FEATURE_DTYPE)
+        if features.ndim == 1:
+            features = features[None, :]
+        if features.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features per sample, got {features.shape[1]}")
+        if len(labels) != len(features):
+            raise ValueError("features and labels must have the same length")
+        if paths is None:
+            paths = [''] * len(features)
+
+        codes = np.asarray([self.class_index(label) for label in labels], dtype=LABEL_DTYPE)
+        count = len(self)
+
+        # Rows past num_samples belong to an interrupted append, drop them first
+        with open(os.path.join(self.root, FEATURES_FILE), 'r+b') as f:
+            f.truncate(count * self.n_features * FEATURE_DTYPE().itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(features.tobytes())
+        with open(os.path.join(self.root, LABELS_FILE), 'r+b') as f:
+            f.truncate(count * LABEL_DTYPE().itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(codes.tobytes())
+        paths_file = os.path.join(self.root, PATHS_FILE)
+        with open(paths_file, encoding='utf-8') as f:
+            existing = f.read().splitlines()
+        if len(existing) != count:
+            with open(paths_file, 'w', encoding='utf-8') as f:
+                f.writelines(path + '\n' for path in existing[:count])
+        with open(paths_file, 'a', encoding='utf-8') as f:
+            f.writelines(str(path).replace('\n', ' ') + '\n' for path in paths)
+
+        self.meta['num_samples'] = count + len(features)
+        self._write_meta(self.root, self.meta)
+
+
+def _read_pickle(path):
+    with open(path, 'rb') as f:
+        data_dict = pickle.load(f)
+    # data.pickle uses 'data', datawords.pickle uses 'datawords'
+    key = 'data' if 'data' in data_dict else 'datawords'
+    return data_dict[key], data_dict['labels'], data_dict.get('spec')
+
+
+def _pickle_spec(spec, features):
+    # Pickles written before specs were saved get one guessed from their width
+    if spec is None:
+        return legacy_spec(features.shape[1])
+    return check_spec(spec, features.shape[1])
+
+
+def convert_pickle(pickle_path, root):
+    """Convert a {'data': ..., 'labels': ...} pickle into a FeatureStore at root"""
+    data, labels, spec = _read_pickle(pickle_path)
+    features = np.asarray(data, dtype=FEATURE_DTYPE)
+    classes = sorted({str(label) for label in labels}, key=_class_key)
+    store = FeatureStore.create(root, features.shape[1], classes, _pickle_spec(spec, features))
+    store.append(features, labels)
+    return store
+
+
+def load_dataset(path, with_spec=False):
+    """Load (features, labels, classes) from a FeatureStore directory or a legacy pickle.
+
+    labels are integer indices into classes. With with_spec=True the
+    dataset's validated feature spec is returned as a fourth item.
+    """
+    if os.path.isdir(path):
+        store = FeatureStore(path)
+        dataset = store.features, store.labels, list(store.classes)
+        return dataset + (store.spec,) if with_spec else dataset
+    data, labels, spec = _read_pickle(path)
+    classes = sorted({str(label) for label in labels}, key=_class_key)
+    index = {name: i for i, name in enumerate(classes)}
+    codes = np.asarray([index[str(label)] for label in labels], dtype=LABEL_DTYPE)
+    features = np.asarray(data, dtype=FEATURE_DTYPE)
+    if with_spec:
+        return features, codes, classes, _pickle_spec(spec, features)
+    return features, codes, classes
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python feature_store.py <data.pickle> <store_dir>")
+        sys.exit(1)
+    store = convert_pickle(sys.argv[1], sys.argv[2])
+    print(f"Wrote {len(store)} samples x {store.n_features} features "
+          f"({len(store.classes)} classes) to {sys.argv[2]}")
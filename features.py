@@ -0,0 +1,240 @@
+"""Landmark feature extraction shared by dataset creation, training and inference.
+
+Every script turns MediaPipe hand landmarks into a flat feature vector the same
+way through this module, so train-time and serve-time features cannot drift.
+"""
+import os
+import json
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Landmarks saved next to a collected image (see quality_gate.py) so it never
+# has to go through MediaPipe again
+LANDMARKS_SUFFIX = '.landmarks.npy'
+
+# Layouts produced by extract_features
+MINSHIFT_XY = 'minshift_xy'  # create_dataset.py / model.p: 42 values per hand
+RAW_XYZ = 'raw_xyz'          # sign_language_app.py / live_detection.py: 63 raw values
+
+# Version of the feature/label spec saved with every model and dataset
+SPEC_VERSION = 1
+
+
+def hands_to_array(multi_hand_landmarks, max_hands=None):
+    """Convert results.multi_hand_landmarks to a (hands, 21, 3) float32 array"""
+    if not multi_hand_landmarks:
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    if max_hands is not None:
+        multi_hand_landmarks = multi_hand_landmarks[:max_hands]
+    coords = [(lm.x, lm.y, lm.z) for hand in multi_hand_landmarks for lm in hand.landmark]
+    return np.asarray(coords, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+
+
+def minshift_xy(hands, normalize_scale=False):
+    """x/y relative to the top-left of the hand(s), flattened as x0, y0, x1, y1, ...
+
+    Matches the original create_dataset.py loop: hand k is shifted by the minimum
+    over hands 0..k, not just its own minimum.
+    """
+    if len(hands) == 0:
+        return np.empty(0, dtype=np.float32)
+    return minshift_xy_batch(hands[None], normalize_scale)[0]
+
+
+def minshift_xy_batch(hands, normalize_scale=False):
+    """minshift_xy for a (samples, hands, 21, 3) array at once, one row per sample"""
+    xy = hands[:, :, :, :2]
+    offsets = np.minimum.accumulate(xy.min(axis=2), axis=1)
+    shifted = xy - offsets[:, :, None, :]
+    if normalize_scale:
+        extent = shifted.max(axis=(2, 3))
+        shifted = shifted / np.maximum(extent, 1e-6)[:, :, None, None]
+    return shifted.reshape(len(hands), -1)
+
+
+def raw_xyz(hands):
+    """Raw x, y, z values flattened as x0, y0, z0, x1, ..."""
+    return hands.reshape(-1)
+
+
+def features_from_array(hands, layout=MINSHIFT_XY, max_hands=None, normalize_scale=False):
+    """Feature vector from a (hands, 21, 3) array, or None if it holds no hand"""
+    if max_hands is not None:
+        hands = hands[:max_hands]
+    if len(hands) == 0:
+        return None
+    if layout == MINSHIFT_XY:
+        return minshift_xy(hands, normalize_scale)
+    if layout == RAW_XYZ:
+        return raw_xyz(hands)
+    raise ValueError(f"Unknown feature layout: {layout}")
+
+
+def extract_features(multi_hand_landmarks, layout=MINSHIFT_XY, max_hands=None, normalize_scale=False):
+    """Feature vector for one frame, or None if no hand was detected"""
+    return features_from_array(hands_to_array(multi_hand_landmarks, max_hands), layout,
+                               normalize_scale=normalize_scale)
+
+
+def landmarks_path(img_path):
+    return os.path.splitext(img_path)[0] + LANDMARKS_SUFFIX
+
+
+def load_landmarks(img_path):
+    """(hands, 21, 3) array stored alongside img_path at collection time, or None.
+
+    A sidecar older than its image belongs to an earlier frame that was
+    overwritten (e.g. unpacked from a shard), so it is ignored.
+    """
+    path = landmarks_path(img_path)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(img_path) and os.path.getmtime(path) < os.path.getmtime(img_path):
+        return None
+    return np.load(path)
+
+
+def layout_for(n_features):
+    """Guess the (layout, max_hands) a model was trained on from its input width"""
+    if n_features == 63:
+        return RAW_XYZ, 1
+    if n_features % 42 == 0:
+        return MINSHIFT_XY, n_features // 42
+    raise ValueError(f"Don't know which features produce {n_features} inputs")
+
+
+def feature_width(layout, max_hands=1):
+    return (2 if layout == MINSHIFT_XY else 3) * NUM_LANDMARKS * max_hands
+
+
+def default_label(class_name):
+    """Text shown for a class: letter folders 0..25 are A..Z (see collect_imgs.py)"""
+    name = str(class_name)
+    if name.isdigit() and int(name) < 26:
+        return chr(65 + int(name))
+    return name
+
+
+def parse_labels(text):
+    """'0=A,1=B,2=L' -> {'0': 'A', '1': 'B', '2': 'L'}"""
+    labels = {}
+    for pair in filter(None, text.split(',')):
+        name, sep, shown = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Expected class=label, got {pair!r}")
+        labels[name.strip()] = shown.strip()
+    return labels
+
+
+def make_spec(layout, max_hands=1, classes=None, labels=None, normalize_scale=False):
+    """Feature/label spec saved with a model or dataset.
+
+    It records how feature vectors were built (layout, max_hands,
+    normalize_scale, n_features) and, when classes are given, the text to
+    show for each class; `labels` overrides default_label per class name.
+    """
+    spec = {'version': SPEC_VERSION, 'layout': layout, 'max_hands': int(max_hands),
+            'normalize_scale': bool(normalize_scale), 'n_features': feature_width(layout, max_hands)}
+    if classes is not None:
+        labels = labels or {}
+        spec['labels'] = {str(c): labels.get(str(c), default_label(c)) for c in classes}
+    elif labels:
+        spec['labels'] = dict(labels)
+    return spec
+
+
+def legacy_spec(n_features, classes=None, layout=None):
+    """Spec for a model or dataset saved before specs existed, guessed from its width"""
+    layout = layout or layout_for(n_features)[0]
+    return make_spec(layout, n_features // feature_width(layout), classes)
+
+
+def check_spec(spec, n_features=None):
+    """Validate a loaded spec (and the width it is used with); returns it unchanged"""
+    if spec.get('version', 0) > SPEC_VERSION:
+        raise ValueError(f"Feature spec version {spec.get('version')} is newer than this code ({SPEC_VERSION})")
+    if spec.get('layout') not in (MINSHIFT_XY, RAW_XYZ):
+        raise ValueError(f"Unknown feature layout: {spec.get('layout')}")
+    if spec.get('n_features') != feature_width(spec['layout'], spec.get('max_hands', 1)):
+        raise ValueError(f"Spec says {spec.get('n_features')} features, "
+                         f"but {spec.get('max_hands')} hand(s) of {spec['layout']} give "
+                         f"{feature_width(spec['layout'], spec.get('max_hands', 1))}")
+    if n_features is not None and n_features != spec['n_features']:
+        raise ValueError(f"Got {n_features} features, spec describes {spec['n_features']} "
+                         f"({spec['layout']}, {spec['max_hands']} hand(s))")
+    return spec
+
+
+def same_features(spec, other):
+    """True if both specs describe identical feature vectors (labels may differ)"""
+    keys = ('layout', 'max_hands', 'normalize_scale')
+    return all(spec.get(key) == other.get(key) for key in keys)
+
+
+def model_spec(model):
+    """The spec a loader attached to `model`, or one guessed for a legacy model"""
+    spec = getattr(model, 'feature_spec_', None)
+    if spec is None:
+        spec = legacy_spec(model.n_features_in_, getattr(model, 'classes_', None))
+    return check_spec(spec, model.n_features_in_)
+
+
+def attach_spec(model, spec):
+    """Validate `spec` against a loaded model and keep it on the model as feature_spec_"""
+    if spec is None:
+        spec = legacy_spec(model.n_features_in_, getattr(model, 'classes_', None))
+    model.feature_spec_ = check_spec(spec, model.n_features_in_)
+    return model
+
+
+def spec_to_json(spec):
+    return json.dumps(spec, sort_keys=True)
+
+
+def spec_from_json(text):
+    return json.loads(text) if text else None
+
+
+def spec_label(spec, class_name):
+    """Text to show for a predicted class"""
+    return spec.get('labels', {}).get(str(class_name), default_label(class_name))
+
+
+def spec_features(hands, spec):
+    """Feature vector the spec describes from a (hands, 21, 3) array.
+
+    Returns None when fewer hands were found than the spec needs, instead of a
+    vector of the wrong width.
+    """
+    if len(hands) < spec['max_hands']:
+        return None
+    return features_from_array(hands, spec['layout'], spec['max_hands'], spec['normalize_scale'])
+
+
+def convert_features(X, source, target):
+    """Re-derive a batch of feature rows in `target`'s layout without re-extracting.
+
+    Only raw x/y/z rows hold enough to build other layouts from; anything else
+    must already match.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if same_features(source, target):
+        return X
+    if source['layout'] != RAW_XYZ or source['max_hands'] < target['max_hands']:
+        raise ValueError(f"Can't build {target['layout']} x{target['max_hands']} features from "
+                         f"{source['layout']} x{source['max_hands']}; re-extract from the images instead")
+    hands = X.reshape(len(X), source['max_hands'], NUM_LANDMARKS, 3)[:, :target['max_hands']]
+    if target['layout'] == RAW_XYZ:
+        return np.ascontiguousarray(hands).reshape(len(X), -1)
+    return minshift_xy_batch(hands, target['normalize_scale']).astype(np.float32)
+
+
+def bounding_box(multi_hand_landmarks, width, height, margin=10):
+    """Pixel bounding box (x1, y1, x2, y2) around all detected hands"""
+    xy = hands_to_array(multi_hand_landmarks)[:, :, :2].reshape(-1, 2)
+    min_x, min_y = xy.min(axis=0)
+    max_x, max_y = xy.max(axis=0)
+    return (int(min_x * width) - margin, int(min_y * height) - margin,
+            int(max_x * width) - margin, int(max_y * height) - margin)
@@ -0,0 +1,150 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from features import hands_to_array, model_spec, spec_features, spec_label
+from predictor import BatchPredictor
+from compiled_forest import load_model
+from tracking import HandTracker
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+FIELDS = ['frame', 'source', 'timestamp_ms', 'hands', 'label', 'confidence', 'latency_ms']
+
+
+def parse_frame_size(text):
+    """'640x480' -> (640, 480)"""
+    width, sep, height = text.lower().partition('x')
+    if not (sep and width.isdigit() and height.isdigit() and int(width) > 0 and int(height) > 0):
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, e.g. 640x480, got {text!r}")
+    return int(width), int(height)
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video {path}")
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield path, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+    finally:
+        cap.release()
+
+
+def directory_frames(path):
+    """Images in name order; they have no capture time, so the timestamp is None"""
+    names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+    for name in names:
+        frame = cv2.imread(os.path.join(path, name))
+        if frame is not None:
+            yield name, None, frame
+
+
+def stdin_frames(width, height, fps):
+    """Raw BGR24 frames, e.g. from `ffmpeg -f rawvideo -pix_fmt bgr24 -`"""
+    frame_size = width * height * 3
+    stream = sys.stdin.buffer
+    index = 0
+    while True:
+        buf = stream.read(frame_size)
+        if len(buf) < frame_size:
+            break
+        yield 'stdin', index * 1000.0 / fps, np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 3)
+        index += 1
+
+
+class HeadlessDetector:
+    """Same detect + classify path as the GUI apps, without camera or display"""
+
+    def __init__(self, model, static_image_mode=False, tracking=False):
+        self.predictor = BatchPredictor(model)
+        self.spec = model_spec(model)
+        if tracking and not static_image_mode:
+            self.hands = HandTracker(max_num_hands=self.spec['max_hands'], min_detection_confidence=0.3)
+        else:
+            self.hands = mp.solutions.hands.Hands(static_image_mode=static_image_mode,
+                                                  max_num_hands=self.spec['max_hands'],
+                                                  min_detection_confidence=0.3)
+
+    def detect(self, frame):
+        """Return (hands detected, label, confidence) for one BGR frame"""
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(frame_rgb)
+        if not results.multi_hand_landmarks:
+            return 0, None, None
+        features = spec_features(hands_to_array(results.multi_hand_landmarks), self.spec)
+        if features is None:
+            # e.g. one hand seen by a two-hand model
+            return len(results.multi_hand_landmarks), None, None
+        label, confidence = self.predictor.predict_one(features)
+        return len(results.multi_hand_landmarks), spec_label(self.spec, label), round(confidence, 4)
+
+    def close(self):
+        self.hands.close()
+
+
+def open_writer(out, fmt):
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: out.write(json.dumps(row) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run sign detection on files or streams without a GUI")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help="Video file to process")
+    source.add_argument('--images', help="Directory of images to process")
+    source.add_argument('--stdin', metavar='WxH', type=parse_frame_size, help="Raw BGR24 frames of this size on stdin")
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame rate used for --stdin timestamps")
+    parser.add_argument('--model', default='model.p', help="Pickled model or compiled .npz forest")
+    parser.add_argument('--tracking', action='store_true',
+                        help="Track the hand ROI between video frames instead of searching every frame")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--output', default='-', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = video_frames(args.video)
+    elif args.images:
+        frames = directory_frames(args.images)
+    else:
+        frames = stdin_frames(*args.stdin, args.fps)
+
+    detector = HeadlessDetector(load_model(args.model), static_image_mode=bool(args.images),
+                                tracking=args.tracking)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    write = open_writer(out, args.format)
+
+    count = 0
+    started = time.perf_counter()
+    try:
+        for count, (name, timestamp_ms, frame) in enumerate(frames, start=1):
+            frame_started = time.perf_counter()
+            hands, label, confidence = detector.detect(frame)
+            if timestamp_ms is not None:
+                timestamp_ms = round(timestamp_ms, 2)
+            write({'frame': count - 1, 'source': name, 'timestamp_ms': timestamp_ms,
+                   'hands': hands, 'label': label, 'confidence': confidence,
+                   'latency_ms': round((time.perf_counter() - frame_started) * 1000, 3)})
+    finally:
+        detector.close()
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Processed {count} frames in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.1f} fps)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
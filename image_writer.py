@@ -0,0 +1,239 @@
+import io
+import os
+import sys
+import time
+import queue
+import tarfile
+import argparse
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from features import landmarks_path, LANDMARKS_SUFFIX
+
+
+class RateMeter:
+    """Events per second over the last `window` seconds"""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.total = 0
+        self._events = deque()
+        self._started = None
+        self._lock = threading.Lock()
+
+    def add(self, count=1):
+        now = time.perf_counter()
+        with self._lock:
+            if self._started is None:
+                self._started = now
+            self._events.append((now, count))
+            self.total += count
+
+    @property
+    def rate(self):
+        now = time.perf_counter()
+        with self._lock:
+            while self._events and self._events[0][0] < now - self.window:
+                self._events.popleft()
+            if self._started is None:
+                return 0.0
+            elapsed = min(self.window, now - self._started)
+            return sum(count for _, count in self._events) / elapsed if elapsed > 0 else 0.0
+
+
+class ImageWriter:
+    """Encodes and saves collected frames on background threads.
+
+    put() copies the frame into a bounded queue and returns, so the capture
+    loop never waits on JPEG encoding or the disk. Writer threads take up to
+    batch_size frames at a time, encode them with cv2.imencode (which
+    releases the GIL) and write them to data_dir/<label>/<name>. With
+    shard=True each class is appended to a single data_dir/<label>.tar
+    instead; unpack_shards() turns those back into class folders. Landmarks
+    passed to put() are saved next to the image (features.landmarks_path) so
+    dataset creation can skip MediaPipe for it; an image written without
+    landmarks removes any sidecar left over from an earlier session.
+
+    A full queue makes put() wait rather than drop frames, which shows up as
+    a lower capture rate in summary(). An unexpected error on a writer
+    thread is re-raised by the next put(), flush() or close().
+    """
+
+    def __init__(self, data_dir='./data', quality=95, workers=2, queue_size=64, batch_size=8, shard=False):
+        self.data_dir = data_dir
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self.batch_size = batch_size
+        self.shard = shard
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.capture_rate = RateMeter()
+        self.write_rate = RateMeter()
+        self.written = 0
+        self.bytes_written = 0
+        self.failed = 0
+        self.error = None
+        self._exception = None
+        self._lock = threading.Lock()
+        self._shards = {}
+        self._folders = set()
+        self._closing = threading.Event()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, frame, label, name, landmarks=None):
+        self._raise_pending()
+        self.queue.put((frame.copy(), str(label), name, landmarks))
+        self.capture_rate.add()
+
+    def flush(self):
+        """Wait until every queued frame is on disk"""
+        self.queue.join()
+        self._raise_pending()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._closing.set()
+            for thread in self._threads:
+                thread.join()
+            for shard in self._shards.values():
+                shard.close()
+            self._shards = {}
+
+    def _raise_pending(self):
+        with self._lock:
+            exception, self._exception = self._exception, None
+        if exception is not None:
+            raise exception
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self):
+        return (f"capture {self.capture_rate.rate:.1f} fps | write {self.write_rate.rate:.1f} fps | "
+                f"{self.queue.qsize()} queued | {self.written} written "
+                f"({self.bytes_written / 1e6:.1f} MB)" + (f" | {self.failed} failed" if self.failed else ""))
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                if self._closing.is_set():
+                    return
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Keep draining the queue so put()/flush() never block; the caller sees the error
+                self._failed(f"{type(e).__name__}: {e}")
+                with self._lock:
+                    self._exception = self._exception or e
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write_batch(self, batch):
+        by_label = {}
+        for frame, label, name, landmarks in batch:
+            ok, encoded = cv2.imencode('.jpg', frame, self.params)
+            if not ok:
+                self._failed(f"Could not encode {label}/{name}")
+                continue
+            files = by_label.setdefault(label, [])
+            files.append((name, encoded.tobytes()))
+            if landmarks is not None:
+                buffer = io.BytesIO()
+                np.save(buffer, np.asarray(landmarks, dtype=np.float32))
+                files.append((landmarks_path(name), buffer.getvalue()))
+            elif not self.shard:
+                # None = delete: a sidecar from an earlier session no longer matches this image
+                files.append((landmarks_path(name), None))
+
+        for label, images in by_label.items():
+            try:
+                if self.shard:
+                    self._append_to_shard(label, images)
+                else:
+                    self._write_files(label, images)
+            except OSError as e:
+                self._failed(str(e))
+                continue
+            saved = sum(1 for name, _ in images if not name.endswith(LANDMARKS_SUFFIX))
+            with self._lock:
+                self.written += saved
+                self.bytes_written += sum(len(data) for _, data in images if data is not None)
+            self.write_rate.add(saved)
+
+    def _write_files(self, label, images):
+        folder = os.path.join(self.data_dir, label)
+        if folder not in self._folders:
+            os.makedirs(folder, exist_ok=True)
+            self._folders.add(folder)
+        for name, data in images:
+            path = os.path.join(folder, name)
+            if data is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def _append_to_shard(self, label, images):
+        with self._lock:
+            shard = self._shards.get(label)
+            if shard is None:
+                os.makedirs(self.data_dir, exist_ok=True)
+                shard = tarfile.open(os.path.join(self.data_dir, f'{label}.tar'), 'a')
+                self._shards[label] = shard
+            # One lock for the whole batch: tar members have to be appended one after another
+            for name, data in images:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = time.time()
+                shard.addfile(info, io.BytesIO(data))
+
+    def _failed(self, message):
+        with self._lock:
+            self.failed += 1
+            self.error = message
+
+
+def unpack_shards(data_dir='./data', remove=False):
+    """Extract every data_dir/<label>.tar into data_dir/<label>/ for create_dataset.py"""
+    count = 0
+    for entry in sorted(os.listdir(data_dir)):
+        label, ext = os.path.splitext(entry)
+        if ext != '.tar':
+            continue
+        path = os.path.join(data_dir, entry)
+        with tarfile.open(path) as shard:
+            members = [member for member in shard.getmembers() if member.isfile()]
+            shard.extractall(os.path.join(data_dir, label), members=members, filter='data')
+        count += sum(1 for member in members if not member.name.endswith(LANDMARKS_SUFFIX))
+        if remove:
+            os.remove(path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unpack per-class image shards into class folders")
+    parser.add_argument('data_dir', nargs='?', default='./data')
+    parser.add_argument('--remove', action='store_true', help="Delete each shard after unpacking it")
+    args = parser.parse_args()
+    if not os.path.isdir(args.data_dir):
+        print(f"Error: {args.data_dir} is not a directory")
+        sys.exit(1)
+    print(f"Unpacked {unpack_shards(args.data_dir, args.remove)} images")
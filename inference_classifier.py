@@ -1,11 +1,24 @@
-import pickle
+import argparse
 
 import cv2
 import mediapipe as mp
-import numpy as np
 
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
+from features import hands_to_array, bounding_box, model_spec, spec_features, spec_label, parse_labels
+from predictor import BatchPredictor
+from tracking import HandTracker
+from compiled_forest import load_model
+
+parser = argparse.ArgumentParser(description="Classify signs from the webcam")
+parser.add_argument('--model', default='./model.p', help="Pickled or compiled (.npz) model")
+parser.add_argument('--labels', type=parse_labels, default={},
+                    help="Override the text shown per class, e.g. 0=A,1=B,2=L")
+args = parser.parse_args()
+
+model = load_model(args.model)
+# Feature layout and class labels the model was trained with (copied, the model keeps its own)
+spec = dict(model_spec(model))
+spec['labels'] = {**spec.get('labels', {}), **args.labels}
+predictor = BatchPredictor(model)
 
 cap = cv2.VideoCapture(0)
 
@@ -13,15 +26,11 @@ mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
-hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3)
+# Track the hand between frames instead of running the palm detector on every frame
+hands = HandTracker(max_num_hands=max(2, spec['max_hands']), min_detection_confidence=0.3)
 
-labels_dict = {0: 'A', 1: 'B', 2: 'L'}
 while True:
 
-    data_aux = []
-    x_ = []
-    y_ = []
-
     ret, frame = cap.read()
 
     H, W, _ = frame.shape
@@ -38,29 +47,17 @@ while True:
                 mp_drawing_styles.get_default_hand_landmarks_style(),
                 mp_drawing_styles.get_default_hand_connections_style())
 
-        for hand_landmarks in results.multi_hand_landmarks:
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-
-                x_.append(x)
-                y_.append(y)
-
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                data_aux.append(x - min(x_))
-                data_aux.append(y - min(y_))
-
-        x1 = int(min(x_) * W) - 10
-        y1 = int(min(y_) * H) - 10
-
-        x2 = int(max(x_) * W) - 10
-        y2 = int(max(y_) * H) - 10
+        data_aux = spec_features(hands_to_array(results.multi_hand_landmarks), spec)
+        if data_aux is None:
+            # e.g. one hand seen by a two-hand model
+            cv2.imshow('frame', frame)
+            cv2.waitKey(1)
+            continue
+        x1, y1, x2, y2 = bounding_box(results.multi_hand_landmarks, W, H)
 
-        prediction = model.predict([np.asarray(data_aux)])
+        prediction, confidence = predictor.predict_one(data_aux)
 
-        predicted_character = labels_dict[int(prediction[0])]
+        predicted_character = spec_label(spec, prediction)
 
         cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
         cv2.putText(frame, predicted_character, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3,
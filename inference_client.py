@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from feature_store import load_dataset
+
+
+class InferenceClient:
+    """Minimal client for inference_server.py"""
+
+    def __init__(self, url='http://127.0.0.1:8765', model='letters', smoothing=False):
+        self.url = url.rstrip('/')
+        options = {'model': model, 'smoothing': smoothing}
+        self.session = self._request('/sessions', json.dumps(options).encode())['session']
+
+    def _request(self, path, data=None, content_type='application/json', method=None):
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={'Content-Type': content_type})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def predict_features(self, features):
+        body = json.dumps({'features': [float(v) for v in features]}).encode()
+        return self._request(f'/sessions/{self.session}/features', body)
+
+    def predict_frame(self, jpeg_bytes):
+        return self._request(f'/sessions/{self.session}/frame', jpeg_bytes, 'image/jpeg')
+
+    def close(self):
+        self._request(f'/sessions/{self.session}', method='DELETE')
+
+
+def run_client(url, model, payloads, mode, requests, latencies, errors):
+    # No smoothing: every request is an unrelated vector and should reach the batched predictor
+    client = InferenceClient(url, model, smoothing=False)
+    send = client.predict_frame if mode == 'frames' else client.predict_features
+    for i in range(requests):
+        started = time.perf_counter()
+        try:
+            send(payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - started)
+        except urllib.error.HTTPError as e:
+            errors.append(e.code)
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against a local inference_server.py")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--model', default='words', help="Served model name")
+    parser.add_argument('--mode', choices=['features', 'frames'], default='features')
+    parser.add_argument('--data', default='datawords.pickle', help="Feature vectors for --mode features")
+    parser.add_argument('--images', default='datawords/0', help="JPEG directory for --mode frames")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client")
+    args = parser.parse_args()
+
+    if args.mode == 'frames':
+        names = sorted(os.listdir(args.images))[:50]
+        payloads = []
+        for name in names:
+            with open(os.path.join(args.images, name), 'rb') as f:
+                payloads.append(f.read())
+    else:
+        X, _, _ = load_dataset(args.data)
+        payloads = np.asarray(X[:500])
+
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=run_client,
+                                args=(args.url, args.model, payloads, args.mode, args.requests, latencies, errors))
+               for _ in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ms = np.asarray(latencies) * 1000
+    print(f"{len(latencies)} ok, {len(errors)} rejected/failed in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} req/s)")
+    if len(ms):
+        print(f"latency p50 {np.percentile(ms, 50):.2f} ms  p95 {np.percentile(ms, 95):.2f} ms  "
+              f"p99 {np.percentile(ms, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
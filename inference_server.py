@@ -0,0 +1,284 @@
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from features import model_spec, spec_features, spec_label
+from predictor import BatchPredictor
+from smoothing import PredictionSmoother
+from compiled_forest import load_model
+
+DEFAULT_MODELS = {'letters': 'model.p', 'words': 'modelwords.p'}
+
+# One MediaPipe graph per detection worker process
+_hands = None
+
+
+def _init_detector():
+    global _hands
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2,
+                                      min_detection_confidence=0.3)
+
+
+def _detect_in_worker(image_bytes):
+    """Decode an encoded frame and return its (hands, 21, 3) landmark array"""
+    import cv2
+    from features import hands_to_array
+    frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Could not decode image")
+    results = _hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return hands_to_array(results.multi_hand_landmarks)
+
+
+class ServerBusy(Exception):
+    pass
+
+
+class FeatureSizeError(ValueError):
+    """A feature vector of the wrong length for the session's model"""
+
+    def __init__(self, n_features, got):
+        super().__init__(f"Expected {n_features} features, got {got}")
+        self.n_features = n_features
+
+
+class InferenceService:
+    """Shared models, detection pool and per-session state behind the HTTP server.
+
+    Each model is loaded once and fronted by a BatchPredictor, so requests from
+    all sessions are classified together. Frames are decoded and run through
+    MediaPipe in a process pool; at most max_pending frames may be in flight,
+    beyond that requests are rejected (HTTP 503) instead of queueing without
+    bound. Every request is classified on its own unless the session was
+    created with smoothing, which gives it a PredictionSmoother for a
+    stream of frames from one camera. Sessions expire after session_timeout
+    seconds of inactivity.
+    """
+
+    def __init__(self, models=None, workers=2, max_pending=32, session_timeout=300.0):
+        self.predictors = {}
+        self.specs = {}
+        for name, path in (models or DEFAULT_MODELS).items():
+            model = load_model(path)
+            self.predictors[name] = BatchPredictor(model)
+            self.predictors[name].start()
+            self.specs[name] = model_spec(model)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_detector) if workers else None
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.session_timeout = session_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.frames = 0
+        self.vectors = 0
+        self.rejected = 0
+
+    def create_session(self, model='letters', smoothing=False):
+        if not isinstance(model, str) or model not in self.predictors:
+            raise ValueError(f"Unknown model: {model!r}; choose from {', '.join(self.predictors)}")
+        session_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            self._expire_sessions()
+            self.sessions[session_id] = {
+                'model': model,
+                'smoother': PredictionSmoother(self.predictors[model].classes) if smoothing else None,
+                'last_seen': time.time(),
+                'predictions': 0,
+                'lock': threading.Lock(),
+            }
+        return session_id
+
+    def close_session(self, session_id):
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def predict_features(self, session_id, features):
+        session = self._session(session_id)
+        features = np.asarray(features, dtype=np.float32)
+        n_features = self.predictors[session['model']].model.n_features_in_
+        if features.shape != (n_features,):
+            raise FeatureSizeError(n_features, features.size)
+        with self.lock:
+            self.vectors += 1
+        return self._classify(session, features)
+
+    def predict_frame(self, session_id, image_bytes):
+        session = self._session(session_id)
+        if self.pool is None:
+            raise ServerBusy("Frame detection is disabled on this server")
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise ServerBusy("Too many frames in flight")
+        try:
+            hands = self.pool.submit(_detect_in_worker, image_bytes).result()
+        finally:
+            self.slots.release()
+        with self.lock:
+            self.frames += 1
+        features = spec_features(hands, self.specs[session['model']])
+        result = self._classify(session, features)
+        result['hands'] = len(hands)
+        return result
+
+    def stats(self):
+        with self.lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 1),
+                'sessions': len(self.sessions),
+                'frames': self.frames,
+                'vectors': self.vectors,
+                'rejected': self.rejected,
+                'models': {name: {'classes': [spec_label(self.specs[name], c) for c in p.classes],
+                                  'calls': p.calls,
+                                  'mean_batch_size': round(p.mean_batch_size, 2)}
+                           for name, p in self.predictors.items()},
+            }
+
+    def close(self):
+        for predictor in self.predictors.values():
+            predictor.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def _session(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                raise KeyError(f"Unknown session: {session_id}")
+            session['last_seen'] = time.time()
+            return session
+
+    def _expire_sessions(self):
+        cutoff = time.time() - self.session_timeout
+        for session_id in [sid for sid, s in self.sessions.items() if s['last_seen'] < cutoff]:
+            del self.sessions[session_id]
+
+    def _classify(self, session, features):
+        # features is None when a frame had fewer hands than the model needs
+        predictor = self.predictors[session['model']]
+        if session['smoother'] is None:
+            label, confidence = (None, 0.0) if features is None else predictor.submit(features).result()
+            with session['lock']:
+                session['predictions'] += 1
+        else:
+            with session['lock']:
+                label, confidence = session['smoother'].update(
+                    features, lambda f: predictor.submit(f, with_proba=True).result())
+                session['predictions'] += 1
+        spec = self.specs[session['model']]
+        return {'label': None if label is None else spec_label(spec, label), 'confidence': round(confidence, 4)}
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """POST /sessions, POST /sessions/<id>/features, POST /sessions/<id>/frame,
+    DELETE /sessions/<id>, GET /stats
+
+    POST /sessions takes an optional {"model": "letters", "smoothing": false}.
+    """
+
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send(200, self.service.stats())
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_DELETE(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'sessions' and self.service.close_session(parts[1]):
+            self._send(200, {'closed': parts[1]})
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        parts = self.path.strip('/').split('/')
+        started = time.perf_counter()
+        try:
+            if parts == ['sessions']:
+                body = self._body()
+                options = json.loads(body) if body else {}
+                if not isinstance(options, dict):
+                    raise ValueError("Body must be a JSON object")
+                if not isinstance(options.get('smoothing', False), bool):
+                    raise ValueError("smoothing must be true or false")
+                session_id = self.service.create_session(options.get('model', 'letters'),
+                                                         options.get('smoothing', False))
+                self._send(200, {'session': session_id})
+                return
+            if len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'features':
+                payload = json.loads(self._body())
+                if not isinstance(payload, dict) or 'features' not in payload:
+                    raise ValueError("Body must be {\"features\": [...]}")
+                result = self.service.predict_features(parts[1], payload['features'])
+            elif len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'frame':
+                result = self.service.predict_frame(parts[1], self._body())
+            else:
+                self._send(404, {'error': 'not found'})
+                return
+        except ServerBusy as e:
+            self._send(503, {'error': str(e)})
+            return
+        except KeyError as e:
+            self._send(404, {'error': str(e.args[0])})
+            return
+        except FeatureSizeError as e:
+            self._send(400, {'error': str(e), 'n_features': e.n_features})
+            return
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self._send(200, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve sign predictions to many cameras from one process")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model', action='append', metavar='NAME=PATH',
+                        help="Model to serve (default: letters=model.p, words=modelwords.p)")
+    parser.add_argument('--workers', type=int, default=2, help="Detection processes (0 = landmarks only)")
+    parser.add_argument('--max-pending', type=int, default=32, help="Frames in flight before returning 503")
+    parser.add_argument('--session-timeout', type=float, default=300.0)
+    args = parser.parse_args()
+
+    models = dict(spec.split('=', 1) for spec in args.model) if args.model else None
+    InferenceHandler.service = InferenceService(models, args.workers, args.max_pending, args.session_timeout)
+    server = ThreadingHTTPServer((args.host, args.port), InferenceHandler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        InferenceHandler.service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import pickle
+import hashlib
+
+CACHE_PATH = '.landmark_cache.pickle'
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class LandmarkCache:
+    """Persistent per-image landmark cache.
+
+    Entries are keyed by image path and validated against the file's size and
+    mtime. If those changed the content hash is compared before giving up, so a
+    touched-but-identical file is still a hit. Images with no detected hand are
+    cached as None so they are not re-processed either.
+
+    `kind` names the feature layout (e.g. 'xy' for create_dataset.py, 'xyz' for
+    the app); a cache file written for another kind is ignored.
+    """
+
+    def __init__(self, path=CACHE_PATH, kind='xy'):
+        self.path = path
+        self.kind = kind
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self._pending = {}
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                stored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            print(f"Warning: ignoring unreadable landmark cache {self.path}")
+            return
+        if stored.get('kind') == self.kind:
+            self.entries = stored.get('entries', {})
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'kind': self.kind, 'entries': self.entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, img_path):
+        """Return (found, features) for img_path, updating the hit/miss counters"""
+        st = os.stat(img_path)
+        entry = self.entries.get(img_path)
+        if entry is not None:
+            if entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+                self.hits += 1
+                return True, entry['features']
+            if entry['size'] == st.st_size:
+                digest = file_digest(img_path)
+                if digest == entry['hash']:
+                    entry['mtime'] = st.st_mtime_ns
+                    self.hits += 1
+                    return True, entry['features']
+                self._pending[img_path] = (st.st_size, st.st_mtime_ns, digest)
+        self.misses += 1
+        return False, None
+
+    def store(self, img_path, features):
+        fingerprint = self._pending.pop(img_path, None)
+        if fingerprint is None:
+            st = os.stat(img_path)
+            fingerprint = (st.st_size, st.st_mtime_ns, file_digest(img_path))
+        size, mtime, digest = fingerprint
+        self.entries[img_path] = {'size': size, 'mtime': mtime, 'hash': digest, 'features': features}
+
+    def prune(self, keep_paths):
+        """Drop entries for images that no longer exist in keep_paths"""
+        keep = set(keep_paths)
+        stale = [path for path in self.entries if path not in keep]
+        for path in stale:
+            del self.entries[path]
+        self.removed += len(stale)
+        return len(stale)
+
+    def report(self):
+        return f"landmark cache: {self.hits} hits, {self.misses} misses, {self.removed} removed"
@@ -0,0 +1,144 @@
+import os
+import time
+import socket
+import argparse
+import threading
+
+import numpy as np
+
+from features import extract_features
+from feature_store import load_dataset
+from landmark_protocol import encode_record, decode_responses, read_hello
+
+
+class LandmarkClient:
+    """Runs hand detection locally and streams only landmark records to landmark_server.py"""
+
+    def __init__(self, host='127.0.0.1', port=8766, session=None):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.hello = read_hello(self.sock)
+        # Display labels from the model's spec; older servers only send class names
+        self.classes = self.hello.get('labels', self.hello['classes'])
+        self.session = session if session is not None else os.getpid() & 0xFFFFFFFF
+        self.bytes_sent = 0
+        self.sent = 0
+        self.received = 0
+        self.latest = None
+        self.latencies = []
+        self._sequence = 0
+        self._sent_at = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def send(self, features):
+        self._sequence += 1
+        record = encode_record(self.session, self._sequence, features, self.hello['dtype'])
+        with self._lock:
+            self._sent_at[self._sequence] = time.perf_counter()
+        self.sock.sendall(record)
+        self.bytes_sent += len(record)
+        self.sent += 1
+
+    def send_landmarks(self, multi_hand_landmarks):
+        """Extract features in the server's layout and send them; False if no usable hand"""
+        features = extract_features(multi_hand_landmarks, self.hello['layout'], self.hello['max_hands'],
+                                    self.hello.get('normalize_scale', False))
+        if features is None or len(features) != self.hello['n_features']:
+            return False
+        self.send(features)
+        return True
+
+    def wait(self, timeout=5.0):
+        deadline = time.time() + timeout
+        while self.received < self.sent and time.time() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        self.sock.close()
+
+    def _read_responses(self):
+        pending = b''
+        while True:
+            try:
+                chunk = self.sock.recv(1 << 16)
+            except OSError:
+                return
+            if not chunk:
+                return
+            pending += chunk
+            responses, used = decode_responses(pending)
+            pending = pending[used:]
+            now = time.perf_counter()
+            for response in responses:
+                with self._lock:
+                    sent_at = self._sent_at.pop(int(response['sequence']), None)
+                if sent_at is not None:
+                    self.latencies.append(now - sent_at)
+                self.latest = (self.classes[response['label']], float(response['confidence']))
+            self.received += len(responses)
+
+
+def stream_camera(client, source):
+    import cv2
+    from tracking import HandTracker
+
+    cap = cv2.VideoCapture(source)
+    tracker = HandTracker(max_num_hands=client.hello['max_hands'])
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            results = tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                client.send_landmarks(results.multi_hand_landmarks)
+            if client.latest is not None:
+                label, confidence = client.latest
+                cv2.putText(frame, f"{label} ({confidence:.0%})", (50, 50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 255, 0), 3, cv2.LINE_AA)
+            cv2.imshow('Landmark client', frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        tracker.close()
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream landmark records to landmark_server.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--video', default=None, help="Video file instead of the webcam")
+    parser.add_argument('--replay', default=None,
+                        help="Send feature vectors from a dataset pickle/store instead of running MediaPipe")
+    parser.add_argument('--count', type=int, default=1000, help="Records to send with --replay")
+    args = parser.parse_args()
+
+    client = LandmarkClient(args.host, args.port)
+    started = time.perf_counter()
+    try:
+        if args.replay:
+            X, _, _ = load_dataset(args.replay)
+            X = np.asarray(X)
+            for i in range(args.count):
+                client.send(X[i % len(X)])
+            client.wait()
+        else:
+            stream_camera(client, args.video if args.video else 0)
+    finally:
+        elapsed = time.perf_counter() - started
+        client.close()
+
+    if client.sent:
+        print(f"{client.sent} records sent, {client.received} predictions received in {elapsed:.2f}s; "
+              f"{client.bytes_sent / client.sent:.0f} bytes per prediction")
+    if client.latencies:
+        ms = np.asarray(client.latencies) * 1000
+        print(f"round trip p50 {np.percentile(ms, 50):.2f} ms  p95 {np.percentile(ms, 95):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+
+import cv2
+import numpy as np
+
+from feature_store import FeatureStore
+from features import features_from_array, feature_width, make_spec, MINSHIFT_XY
+from image_writer import ImageWriter
+
+THUMBNAILS_DIR = 'thumbnails'
+
+
+class LandmarkCollector:
+    """Landmark-only data collection straight into a FeatureStore.
+
+    add() turns the detected hands into a feature vector in the store's
+    layout and buffers it; rows are appended to the store every flush_every
+    samples and on close(), so the dataset is trainable as soon as
+    collection ends, with no images to re-detect. With thumbnail_size set,
+    a downscaled JPEG of each frame is written (by an ImageWriter) to
+    <store>/thumbnails/<label>/<n>.jpg and recorded as the sample's path.
+    """
+
+    def __init__(self, store_path, layout=MINSHIFT_XY, max_hands=1, thumbnail_size=None,
+                 flush_every=30, quality=80):
+        self.store = FeatureStore.open_or_create(store_path, feature_width(layout, max_hands),
+                                                 spec=make_spec(layout, max_hands))
+        self.layout = layout
+        self.max_hands = max_hands
+        self.thumbnail_size = thumbnail_size
+        self.flush_every = flush_every
+        self.added = 0
+        self._rows = []
+        self._labels = []
+        self._paths = []
+        self.thumbnails = None
+        if thumbnail_size:
+            self.thumbnails = ImageWriter(os.path.join(store_path, THUMBNAILS_DIR), quality, workers=1)
+
+    def add(self, frame, label, hands):
+        """Buffer one sample; returns False if hands has fewer hands than the layout needs"""
+        if len(hands) < self.max_hands:
+            return False
+        row = features_from_array(hands, self.layout, self.max_hands)
+        path = ''
+        if self.thumbnails is not None:
+            name = f'{len(self.store) + len(self._rows)}.jpg'
+            self.thumbnails.put(self._thumbnail(frame), label, name)
+            path = os.path.join(THUMBNAILS_DIR, str(label), name)
+        self._rows.append(row)
+        self._labels.append(str(label))
+        self._paths.append(path)
+        self.added += 1
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        if not self._rows:
+            return
+        self.store.append(np.stack(self._rows), self._labels, self._paths)
+        self._rows, self._labels, self._paths = [], [], []
+
+    def close(self):
+        self.flush()
+        if self.thumbnails is not None:
+            self.thumbnails.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        scale = self.thumbnail_size / max(h, w)
+        if scale >= 1.0:
+            return frame
+        return cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+    def summary(self):
+        row_bytes = self.store.n_features * 4 + 2
+        text = f"{self.added} samples collected, {len(self.store) + len(self._rows)} in store ({row_bytes} bytes each)"
+        if self.thumbnails is not None:
+            text += f" | thumbnails {self.thumbnails.summary()}"
+        return text
@@ -0,0 +1,98 @@
+"""Compact binary wire format for streaming landmark vectors to a classifier.
+
+After connecting, the server sends a hello message (4-byte little-endian
+length + JSON) describing the features it expects: layout, max_hands,
+normalize_scale, n_features, value dtype, class names and their display
+labels. From then on the client sends
+fixed-size records and the server answers each with a fixed-size response:
+
+    record   = magic 'SL' | version u8 | dtype u8 | n_values u16 | session u32 |
+               sequence u64 | n_values x float16/float32
+    response = session u32 | sequence u64 | class index i16 | confidence f32
+
+The sequence number is chosen by the client (one per record it sends) and
+echoed back unchanged, so a response can be matched to its record.
+
+A 63-value float16 record is 144 bytes, against tens of kilobytes per JPEG.
+Both directions decode with a NumPy structured dtype, so any number of
+buffered records are parsed in one call.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'SL'
+VERSION = 1
+DTYPE_CODES = {'float16': 0, 'float32': 1}
+HEADER_SIZE = 18
+
+RESPONSE_DTYPE = np.dtype([('session', '<u4'), ('sequence', '<u8'), ('label', '<i2'), ('confidence', '<f4')])
+
+
+def record_dtype(n_values, value_dtype='float16'):
+    return np.dtype([
+        ('magic', 'S2'), ('version', 'u1'), ('dtype', 'u1'), ('n_values', '<u2'),
+        ('session', '<u4'), ('sequence', '<u8'),
+        ('values', np.dtype(value_dtype).newbyteorder('<'), (n_values,)),
+    ])
+
+
+def encode_record(session, sequence, values, value_dtype='float16'):
+    values = np.asarray(values)
+    record = np.zeros(1, dtype=record_dtype(len(values), value_dtype))
+    record['magic'] = MAGIC
+    record['version'] = VERSION
+    record['dtype'] = DTYPE_CODES[value_dtype]
+    record['n_values'] = len(values)
+    record['session'] = session
+    record['sequence'] = sequence
+    record['values'][0] = values
+    return record.tobytes()
+
+
+def decode_records(buf, n_values, value_dtype='float16'):
+    """Decode all complete records at the start of buf.
+
+    Returns (records, bytes consumed); leftover bytes belong to the next read.
+    """
+    dtype = record_dtype(n_values, value_dtype)
+    count = len(buf) // dtype.itemsize
+    records = np.frombuffer(buf, dtype=dtype, count=count)
+    if count and (np.any(records['magic'] != MAGIC) or np.any(records['n_values'] != n_values)):
+        raise ValueError("Malformed landmark record")
+    return records, count * dtype.itemsize
+
+
+def encode_responses(sessions, sequences, labels, confidences):
+    responses = np.empty(len(labels), dtype=RESPONSE_DTYPE)
+    responses['session'] = sessions
+    responses['sequence'] = sequences
+    responses['label'] = labels
+    responses['confidence'] = confidences
+    return responses.tobytes()
+
+
+def decode_responses(buf):
+    count = len(buf) // RESPONSE_DTYPE.itemsize
+    return np.frombuffer(buf, dtype=RESPONSE_DTYPE, count=count), count * RESPONSE_DTYPE.itemsize
+
+
+def recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def send_hello(sock, info):
+    body = json.dumps(info).encode()
+    sock.sendall(struct.pack('<I', len(body)) + body)
+
+
+def read_hello(sock):
+    size, = struct.unpack('<I', recv_exact(sock, 4))
+    return json.loads(recv_exact(sock, size))
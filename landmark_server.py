@@ -0,0 +1,98 @@
+import time
+import argparse
+import threading
+import socketserver
+
+import numpy as np
+
+from features import model_spec, spec_label
+from predictor import BatchPredictor
+from compiled_forest import load_model
+from landmark_protocol import decode_records, encode_responses, send_hello
+
+
+class LandmarkHandler(socketserver.BaseRequestHandler):
+    """One client connection: landmark records in, classification responses out"""
+
+    predictor = None
+    hello = None
+
+    def handle(self):
+        send_hello(self.request, self.hello)
+        n_values = self.hello['n_features']
+        value_dtype = self.hello['dtype']
+        pending = b''
+        while True:
+            chunk = self.request.recv(1 << 16)
+            if not chunk:
+                return
+            pending += chunk
+            try:
+                records, used = decode_records(pending, n_values, value_dtype)
+            except ValueError:
+                return  # drop clients that don't speak the protocol
+            if not used:
+                continue
+            pending = pending[used:]
+
+            # Rows from every connection meet in the same BatchPredictor batches
+            values = records['values'].astype(np.float32)
+            futures = [self.predictor.submit(row, with_proba=True) for row in values]
+            proba = np.stack([future.result() for future in futures])
+            labels = proba.argmax(axis=1)
+            self.request.sendall(encode_responses(records['session'], records['sequence'], labels,
+                                                  proba[np.arange(len(labels)), labels]))
+            with LandmarkServer.counter_lock:
+                LandmarkServer.predictions += len(records)
+                LandmarkServer.bytes_in += used
+
+
+class LandmarkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Totals over all connections, updated from every handler thread
+    counter_lock = threading.Lock()
+    predictions = 0
+    bytes_in = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify streamed landmark records in batches")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--model', default='model.p', help="Pickled model or compiled .npz forest")
+    parser.add_argument('--dtype', choices=['float16', 'float32'], default='float16')
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    spec = model_spec(model)
+    LandmarkHandler.predictor = BatchPredictor(model, args.max_batch_size, args.max_wait_ms / 1000)
+    LandmarkHandler.hello = {
+        'layout': spec['layout'], 'max_hands': spec['max_hands'], 'normalize_scale': spec['normalize_scale'],
+        'n_features': int(model.n_features_in_), 'dtype': args.dtype,
+        'classes': [str(c) for c in model.classes_],
+        'labels': [spec_label(spec, c) for c in model.classes_],
+    }
+
+    server = LandmarkServer((args.host, args.port), LandmarkHandler)
+    print(f"Listening for landmark records on {args.host}:{args.port}")
+    started = time.perf_counter()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        LandmarkHandler.predictor.close()
+        elapsed = time.perf_counter() - started
+        if LandmarkServer.predictions:
+            print(f"{LandmarkServer.predictions} predictions, "
+                  f"{LandmarkServer.bytes_in / LandmarkServer.predictions:.0f} bytes in per prediction, "
+                  f"{LandmarkServer.predictions / elapsed:.1f}/s, "
+                  f"mean batch {LandmarkHandler.predictor.mean_batch_size:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,219 +1,253 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext
-from googletrans import Translator
-import customtkinter as ctk
-from PIL import Image, ImageTk
-
-# Set appearance mode and default color theme
-ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
-ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
-
-# Dictionary mapping language codes to full language names
-LANGUAGES = {
-    'af': 'Afrikaans',
-    'sq': 'Albanian',
-    'ar': 'Arabic',
-    'hy': 'Armenian',
-    'bn': 'Bengali',
-    'bs': 'Bosnian',
-    'bg': 'Bulgarian',
-    'ca': 'Catalan',
-    'zh-CN': 'Chinese (Simplified)',
-    'zh-TW': 'Chinese (Traditional)',
-    'hr': 'Croatian',
-    'cs': 'Czech',
-    'da': 'Danish',
-    'nl': 'Dutch',
-    'en': 'English',
-    'eo': 'Esperanto',
-    'et': 'Estonian',
-    'fi': 'Finnish',
-    'fr': 'French',
-    'gl': 'Galician',
-    'de': 'German',
-    'el': 'Greek',
-    'gu': 'Gujarati',
-    'ht': 'Haitian Creole',
-    'ha': 'Hausa',
-    'he': 'Hebrew',
-    'hi': 'Hindi',
-    'hu': 'Hungarian',
-    'is': 'Icelandic',
-    'id': 'Indonesian',
-    'it': 'Italian',
-    'ja': 'Japanese',
-    'kn': 'Kannada',
-    'ko': 'Korean',
-    'la': 'Latin',
-    'lv': 'Latvian',
-    'lt': 'Lithuanian',
-    'mk': 'Macedonian',
-    'ms': 'Malay',
-    'ml': 'Malayalam',
-    'mr': 'Marathi',
-    'no': 'Norwegian',
-    'fa': 'Persian',
-    'pl': 'Polish',
-    'pt': 'Portuguese',
-    'pa': 'Punjabi',
-    'ro': 'Romanian',
-    'ru': 'Russian',
-    'sr': 'Serbian',
-    'sk': 'Slovak',
-    'sl': 'Slovenian',
-    'es': 'Spanish',
-    'sw': 'Swahili',
-    'sv': 'Swedish',
-    'ta': 'Tamil',
-    'te': 'Telugu',
-    'th': 'Thai',
-    'tr': 'Turkish',
-    'uk': 'Ukrainian',
-    'ur': 'Urdu',
-    'vi': 'Vietnamese',
-    'cy': 'Welsh',
-    'yi': 'Yiddish'
-}
-
-def translate():
-    """Translate text from input to selected language"""
-    # Get the selected language code from the language name
-    selected_language_name = language_var.get()
-    lang_code = [code for code, name in LANGUAGES.items() if name == selected_language_name][0]
-    
-    # Get input text
-    text = input_text.get("1.0", "end-1c")
-    if not text.strip():
-        output_text.delete("1.0", "end")
-        output_text.insert("1.0", "Please enter some text to translate")
-        return
-    
+import os
+import sys
+import time
+import subprocess
+import argparse
+
+# Only the lightweight translation core is imported up front; customtkinter
+# and the translation backend are loaded when the window is actually built.
+from translation import TranslationService, LANGUAGES, LANGUAGE_NAMES, language_code
+
+
+class TranslatorApp:
+    def __init__(self, ctk):
+        self.ctk = ctk
+        # One shared translator with caching and batching, running off the UI thread
+        self.translation_service = TranslationService()
+        self.pending_translation = None
+
+        # Set appearance mode and default color theme
+        ctk.set_appearance_mode("System")  # Modes: "System" (standard), "Dark", "Light"
+        ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
+
+        # Create the main application window
+        self.app = ctk.CTk()
+        self.app.title("Advanced Language Translator")
+        self.app.geometry("900x600")
+        self.app.grid_columnconfigure(0, weight=1)
+        self.app.grid_columnconfigure(1, weight=1)
+        self.app.grid_rowconfigure(2, weight=1)
+        self.setup_gui()
+
+    def setup_gui(self):
+        ctk = self.ctk
+        app = self.app
+
+        # Create header frame
+        header_frame = ctk.CTkFrame(app, corner_radius=0, fg_color="transparent")
+        header_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=20, pady=(20, 10))
+
+        title_label = ctk.CTkLabel(header_frame, text="Language Translator",
+                                   font=ctk.CTkFont(size=24, weight="bold"))
+        title_label.pack(pady=10)
+
+        # Create control frame
+        control_frame = ctk.CTkFrame(app, corner_radius=10)
+        control_frame.grid(row=1, column=0, columnspan=2, sticky="ew", padx=20, pady=10)
+        control_frame.grid_columnconfigure((0, 1, 2), weight=1)
+
+        # Language selection
+        self.language_var = ctk.StringVar(value="Spanish")  # Default language
+        language_label = ctk.CTkLabel(control_frame, text="Translate to:",
+                                      font=ctk.CTkFont(size=14))
+        language_label.grid(row=0, column=0, padx=10, pady=10, sticky="e")
+
+        language_dropdown = ctk.CTkOptionMenu(control_frame, values=LANGUAGE_NAMES,
+                                              variable=self.language_var,
+                                              width=200,
+                                              font=ctk.CTkFont(size=14))
+        language_dropdown.grid(row=0, column=1, padx=10, pady=10, sticky="w")
+
+        # Buttons frame
+        buttons_frame = ctk.CTkFrame(control_frame, fg_color="transparent")
+        buttons_frame.grid(row=0, column=2, padx=10, pady=10)
+
+        translate_button = ctk.CTkButton(buttons_frame, text="Translate",
+                                         command=self.translate,
+                                         font=ctk.CTkFont(size=14, weight="bold"),
+                                         width=120, height=40)
+        translate_button.pack(side="left", padx=5)
+
+        swap_button = ctk.CTkButton(buttons_frame, text="Swap",
+                                    command=self.swap_languages,
+                                    font=ctk.CTkFont(size=14),
+                                    width=80, height=40)
+        swap_button.pack(side="left", padx=5)
+
+        clear_button = ctk.CTkButton(buttons_frame, text="Clear",
+                                     command=self.clear_text,
+                                     font=ctk.CTkFont(size=14),
+                                     width=80, height=40,
+                                     fg_color="#D35B58", hover_color="#C77C78")
+        clear_button.pack(side="left", padx=5)
+
+        # Input and output frames
+        input_frame = ctk.CTkFrame(app, corner_radius=10)
+        input_frame.grid(row=2, column=0, padx=(20, 10), pady=(10, 20), sticky="nsew")
+
+        output_frame = ctk.CTkFrame(app, corner_radius=10)
+        output_frame.grid(row=2, column=1, padx=(10, 20), pady=(10, 20), sticky="nsew")
+
+        # Configure frames to expand
+        input_frame.grid_rowconfigure(1, weight=1)
+        input_frame.grid_columnconfigure(0, weight=1)
+        output_frame.grid_rowconfigure(1, weight=1)
+        output_frame.grid_columnconfigure(0, weight=1)
+
+        # Input area
+        input_label = ctk.CTkLabel(input_frame, text="Enter Text:",
+                                   font=ctk.CTkFont(size=16, weight="bold"))
+        input_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+
+        self.input_text = ctk.CTkTextbox(input_frame, font=ctk.CTkFont(size=14), wrap="word", height=400)
+        self.input_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
+
+        # Output area
+        output_label = ctk.CTkLabel(output_frame, text="Translation:",
+                                    font=ctk.CTkFont(size=16, weight="bold"))
+        output_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
+
+        self.output_text = ctk.CTkTextbox(output_frame, font=ctk.CTkFont(size=14), wrap="word", height=400)
+        self.output_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
+
+        # Status label
+        status_frame = ctk.CTkFrame(app, fg_color="transparent")
+        status_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=20, pady=(0, 10))
+
+        self.status_label = ctk.CTkLabel(status_frame, text="Ready to translate",
+                                         font=ctk.CTkFont(size=14))
+        self.status_label.pack(pady=5)
+
+    def translate(self):
+        """Translate text from input to selected language without blocking the UI"""
+        selected_language_name = self.language_var.get()
+        lang_code = language_code(selected_language_name)
+
+        # Get input text
+        text = self.input_text.get("1.0", "end-1c")
+        if not text.strip():
+            self.output_text.delete("1.0", "end")
+            self.output_text.insert("1.0", "Please enter some text to translate")
+            return
+
+        # A newer request replaces one still in flight
+        if self.pending_translation is not None:
+            self.pending_translation.cancel()
+        self.pending_translation = self.translation_service.translate(text, lang_code)
+        self.status_label.configure(text=f"Translating to {selected_language_name}...", text_color="white")
+        self.poll_translation(self.pending_translation, selected_language_name)
+
+    def poll_translation(self, future, language_name):
+        """Check a running translation from the Tk loop and show it once done"""
+        if future is not self.pending_translation or future.cancelled():
+            return
+        if not future.done():
+            self.app.after(50, self.poll_translation, future, language_name)
+            return
+
+        try:
+            translation = future.result()
+
+            # Display translation
+            self.output_text.delete("1.0", "end")
+            self.output_text.insert("1.0", translation)
+
+            # Show success message
+            self.status_label.configure(text=f"Successfully translated to {language_name}",
+                                        text_color="green")
+        except Exception as e:
+            self.status_label.configure(text=f"Translation error: {str(e)}",
+                                        text_color="red")
+
+    def swap_languages(self):
+        """Swap input and output text"""
+        input_content = self.input_text.get("1.0", "end-1c")
+        output_content = self.output_text.get("1.0", "end-1c")
+
+        self.input_text.delete("1.0", "end")
+        self.input_text.insert("1.0", output_content)
+
+        self.output_text.delete("1.0", "end")
+        self.output_text.insert("1.0", input_content)
+
+    def clear_text(self):
+        """Clear both input and output text fields"""
+        self.input_text.delete("1.0", "end")
+        self.output_text.delete("1.0", "end")
+        self.status_label.configure(text="Ready to translate", text_color="white")
+
+    def run(self):
+        try:
+            self.app.mainloop()
+        finally:
+            self.translation_service.close()
+
+
+def profile_startup(build_window=True, lookups=100000):
+    """Print how long the translation core and the GUI take to import and set up"""
+    # Import cost of the core in a fresh interpreter, net of interpreter startup. The
+    # children run from this directory so they can import translation.py from anywhere
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def fresh(code):
+        best = None
+        for _ in range(3):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, cwd=here)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    core = fresh('import translation') - fresh('pass')
+    # Modules the core adds to a fresh interpreter, not the interpreter's own startup modules
+    added = subprocess.run([sys.executable, '-c', 'import sys; before = set(sys.modules); import translation; '
+                            'print(len(set(sys.modules) - before))'],
+                           check=True, capture_output=True, text=True, cwd=here).stdout.strip()
+    print(f"translation core import: {core * 1000:.1f} ms ({added} modules loaded before the GUI)")
+
+    names = LANGUAGE_NAMES * (lookups // len(LANGUAGE_NAMES) + 1)
+    names = names[:lookups]
+    started = time.perf_counter()
+    for name in names:
+        language_code(name)
+    indexed = time.perf_counter() - started
+    started = time.perf_counter()
+    for name in names:
+        next(code for code, n in LANGUAGES.items() if n == name)
+    scanned = time.perf_counter() - started
+    print(f"language lookup: index {indexed / lookups * 1e9:.0f} ns, linear scan {scanned / lookups * 1e9:.0f} ns")
+
+    started = time.perf_counter()
     try:
-        # Create translator and translate
-        translator = Translator()
-        translation = translator.translate(text, dest=lang_code)
-        
-        # Display translation
-        output_text.delete("1.0", "end")
-        output_text.insert("1.0", translation.text)
-        
-        # Show success message
-        status_label.configure(text=f"Successfully translated to {selected_language_name}", 
-                               text_color="green")
-    except Exception as e:
-        status_label.configure(text=f"Translation error: {str(e)}", 
-                               text_color="red")
-
-def swap_languages():
-    """Swap input and output text"""
-    input_content = input_text.get("1.0", "end-1c")
-    output_content = output_text.get("1.0", "end-1c")
-    
-    input_text.delete("1.0", "end")
-    input_text.insert("1.0", output_content)
-    
-    output_text.delete("1.0", "end")
-    output_text.insert("1.0", input_content)
-
-def clear_text():
-    """Clear both input and output text fields"""
-    input_text.delete("1.0", "end")
-    output_text.delete("1.0", "end")
-    status_label.configure(text="Ready to translate", text_color="white")
-
-# Create the main application window
-app = ctk.CTk()
-app.title("Advanced Language Translator")
-app.geometry("900x600")
-app.grid_columnconfigure(0, weight=1)
-app.grid_columnconfigure(1, weight=1)
-app.grid_rowconfigure(2, weight=1)
-
-# Create header frame
-header_frame = ctk.CTkFrame(app, corner_radius=0, fg_color="transparent")
-header_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=20, pady=(20, 10))
-
-title_label = ctk.CTkLabel(header_frame, text="Language Translator", 
-                          font=ctk.CTkFont(size=24, weight="bold"))
-title_label.pack(pady=10)
-
-# Create control frame
-control_frame = ctk.CTkFrame(app, corner_radius=10)
-control_frame.grid(row=1, column=0, columnspan=2, sticky="ew", padx=20, pady=10)
-control_frame.grid_columnconfigure((0, 1, 2), weight=1)
-
-# Language selection
-language_var = ctk.StringVar(value="Spanish")  # Default language
-language_names = sorted(list(LANGUAGES.values()))
-language_label = ctk.CTkLabel(control_frame, text="Translate to:", 
-                             font=ctk.CTkFont(size=14))
-language_label.grid(row=0, column=0, padx=10, pady=10, sticky="e")
-
-language_dropdown = ctk.CTkOptionMenu(control_frame, values=language_names, 
-                                     variable=language_var, 
-                                     width=200,
-                                     font=ctk.CTkFont(size=14))
-language_dropdown.grid(row=0, column=1, padx=10, pady=10, sticky="w")
-
-# Buttons frame
-buttons_frame = ctk.CTkFrame(control_frame, fg_color="transparent")
-buttons_frame.grid(row=0, column=2, padx=10, pady=10)
-
-translate_button = ctk.CTkButton(buttons_frame, text="Translate", 
-                                command=translate, 
-                                font=ctk.CTkFont(size=14, weight="bold"),
-                                width=120, height=40)
-translate_button.pack(side="left", padx=5)
-
-swap_button = ctk.CTkButton(buttons_frame, text="Swap", 
-                           command=swap_languages,
-                           font=ctk.CTkFont(size=14),
-                           width=80, height=40)
-swap_button.pack(side="left", padx=5)
-
-clear_button = ctk.CTkButton(buttons_frame, text="Clear", 
-                            command=clear_text,
-                            font=ctk.CTkFont(size=14),
-                            width=80, height=40,
-                            fg_color="#D35B58", hover_color="#C77C78")
-clear_button.pack(side="left", padx=5)
-
-# Input and output frames
-input_frame = ctk.CTkFrame(app, corner_radius=10)
-input_frame.grid(row=2, column=0, padx=(20, 10), pady=(10, 20), sticky="nsew")
-
-output_frame = ctk.CTkFrame(app, corner_radius=10)
-output_frame.grid(row=2, column=1, padx=(10, 20), pady=(10, 20), sticky="nsew")
-
-# Configure frames to expand
-input_frame.grid_rowconfigure(1, weight=1)
-input_frame.grid_columnconfigure(0, weight=1)
-output_frame.grid_rowconfigure(1, weight=1)
-output_frame.grid_columnconfigure(0, weight=1)
-
-# Input area
-input_label = ctk.CTkLabel(input_frame, text="Enter Text:", 
-                          font=ctk.CTkFont(size=16, weight="bold"))
-input_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
-
-input_text = ctk.CTkTextbox(input_frame, font=ctk.CTkFont(size=14), wrap="word", height=400)
-input_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
-
-# Output area
-output_label = ctk.CTkLabel(output_frame, text="Translation:", 
-                           font=ctk.CTkFont(size=16, weight="bold"))
-output_label.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="w")
-
-output_text = ctk.CTkTextbox(output_frame, font=ctk.CTkFont(size=14), wrap="word", height=400)
-output_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
-
-# Status label
-status_frame = ctk.CTkFrame(app, fg_color="transparent")
-status_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=20, pady=(0, 10))
-
-status_label = ctk.CTkLabel(status_frame, text="Ready to translate", 
-                           font=ctk.CTkFont(size=14))
-status_label.pack(pady=5)
-
-# Start the application
-app.mainloop()
+        import customtkinter as ctk
+    except ImportError:
+        print("customtkinter is not installed; skipping GUI timings")
+        return
+    print(f"customtkinter import: {(time.perf_counter() - started) * 1000:.1f} ms")
+    if not build_window:
+        return
+    started = time.perf_counter()
+    translator = TranslatorApp(ctk)
+    translator.app.update()
+    print(f"window construction: {(time.perf_counter() - started) * 1000:.1f} ms")
+    translator.app.destroy()
+    translator.translation_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Desktop text translator")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Print import and window construction times, then exit")
+    parser.add_argument('--no-window', action='store_true',
+                        help="With --profile-startup, skip building the window (no display needed)")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup(build_window=not args.no_window)
+        return
+
+    import customtkinter as ctk
+    TranslatorApp(ctk).run()
+
+
+if __name__ == "__main__":
+    main()
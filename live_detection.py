@@ -1,44 +1,93 @@
+import time
 import cv2
-import mediapipe as mp
-import pickle
-import numpy as np
 import tkinter as tk
 from PIL import Image, ImageTk
 import customtkinter as ctk
 
+# mediapipe and the model are loaded in the background once the window is up
+from startup import StartupTimer, BackgroundLoader, load_model_fast, warm_up
+from features import hands_to_array, model_spec, spec_features, spec_label
+from predictor import BatchPredictor
+from pipeline import DetectionPipeline
+from smoothing import PredictionSmoother
+
 class LiveDetector:
     def __init__(self):
+        self.timer = StartupTimer()
+        
         # Create the main window
         self.window = ctk.CTk()
         self.window.title("Sign Language Live Detection")
         self.window.geometry("800x600")
         
-        # Initialize mediapipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=False, max_num_hands=1)
-        self.mp_draw = mp.solutions.drawing_utils
-        
-        # Load the pre-trained model
-        try:
-            with open('model.p', 'rb') as f:
-                data = pickle.load(f)
-                self.model = data['model']
-            print("Model loaded successfully!")
-        except:
-            print("Error: Could not load model.p")
-            self.model = None
+        # Filled in by the background loader; frames are shown unprocessed until then
+        self.mp_hands = None
+        self.mp_draw = None
+        self.hands = None
+        self.model = None
+        self.spec = None
+        self.predictor = None
+        self.smoother = None
+        self.cap = None
 
         # Create GUI elements
         self.setup_gui()
+        self.timer.mark('window')
         
-        # Initialize video capture
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            print("Error: Could not open webcam")
+        # Camera, model and MediaPipe graph load while the window is already up
+        self.loader = BackgroundLoader([
+            ('camera', "Opening webcam", self.open_camera),
+            ('model', "Loading model", lambda: load_model_fast('model.p')),
+            ('hands', "Starting hand tracker", self.create_tracker),
+            ('warmup', "Warming up", self.warm_up),
+        ], self.timer).start()
             
-        # Start video stream
+        # Capture and detection run on their own threads; Tk only displays results
+        self.pipeline = DetectionPipeline(self.read_frame, self.process_frame)
         self.update_frame()
 
+    def open_camera(self):
+        cap = cv2.VideoCapture(0)
+        if not cap.isOpened():
+            raise RuntimeError("Could not open webcam")
+        self.cap = cap
+        return cap
+
+    def create_tracker(self):
+        import mediapipe as mp
+        from tracking import HandTracker
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+        return HandTracker(max_num_hands=1)
+
+    def warm_up(self):
+        model = self.loader.results.get('model')
+        predictor = BatchPredictor(model) if model is not None else None
+        warm_up(self.loader.results.get('hands'), predictor,
+                model.n_features_in_ if model is not None else None)
+        # Detection switches on only once everything it needs is ready
+        if predictor is not None:
+            self.predictor = predictor
+            self.smoother = PredictionSmoother(predictor.classes)
+            self.spec = model_spec(model)
+            self.model = model
+        self.hands = self.loader.results.get('hands')
+        return predictor
+
+    def poll_loader(self):
+        """Tk thread: reflect background loading in the progress bar"""
+        if self.cap is not None and not self.pipeline.running and self.pipeline.error is None:
+            self.pipeline.start()
+        self.load_progress.set(self.loader.progress)
+        if not self.loader.finished:
+            self.load_label.configure(text=self.loader.status())
+            return
+        for name, error in self.loader.errors.items():
+            print(f"Error: {name}: {error}")
+        self.load_progress.pack_forget()
+        self.load_progress = None
+        self.load_label.configure(text=self.loader.status())
+
     def setup_gui(self):
         # Main frame
         self.main_frame = ctk.CTkFrame(self.window)
@@ -55,22 +104,38 @@ class LiveDetector:
             font=("Arial", 24, "bold")
         )
         self.letter_label.pack(pady=10)
+        
+        # Background loading progress
+        self.load_progress = ctk.CTkProgressBar(self.main_frame)
+        self.load_progress.set(0)
+        self.load_progress.pack(pady=5, fill=tk.X)
+        self.load_label = ctk.CTkLabel(self.main_frame, text="Starting...", font=("Arial", 12))
+        self.load_label.pack(pady=5)
+        
+        # Per-stage latency / FPS readout
+        self.stats_label = ctk.CTkLabel(self.main_frame, text="", font=("Arial", 12))
+        self.stats_label.pack(pady=5)
 
-    def update_frame(self):
+    def read_frame(self):
+        """Capture thread: grab the next mirrored frame"""
         if self.cap is None or not self.cap.isOpened():
-            return
-        
+            return None
         ret, frame = self.cap.read()
         if not ret:
-            print("Error: Could not read frame")
-            return
-            
+            return None
         # Flip the frame horizontally for a later selfie-view display
-        frame = cv2.flip(frame, 1)
-        
+        return cv2.flip(frame, 1)
+
+    def process_frame(self, frame):
+        """Worker thread: detect the hand, classify it and annotate the frame"""
         # Convert the frame to RGB
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
+        predicted_letter = None
+        confidence = 0.0
+        if self.hands is None:
+            return frame_rgb, predicted_letter, confidence
+        
         # Process the frame with mediapipe
         results = self.hands.process(frame_rgb)
         
@@ -87,19 +152,20 @@ class LiveDetector:
                 self.mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2)
             )
             
-            # Make prediction if model is loaded
+            # Prepare data for prediction in the layout the model was trained on
+            data_point = None
             if self.model is not None:
-                # Prepare data for prediction
-                data_point = []
-                for lm in landmarks.landmark:
-                    data_point.extend([lm.x, lm.y, lm.z])
-                
-                # Make prediction
-                prediction = self.model.predict([data_point])
-                predicted_letter = chr(65 + prediction[0])  # Convert to letter (A=65 in ASCII)
-                
-                # Update letter label
-                self.letter_label.configure(text=f"Detected Letter: {predicted_letter}")
+                data_point = spec_features(hands_to_array(results.multi_hand_landmarks), self.spec)
+            
+            # Make prediction if model is loaded and saw enough hands
+            if data_point is not None:
+                # Make a smoothed prediction, skipping the classifier while the hand is still
+                prediction, confidence = self.smoother.update(
+                    data_point, lambda features: self.predictor.predict_proba(features)[0])
+                predicted_letter = spec_label(self.spec, prediction)
+                if 'first_prediction' not in self.timer.marks:
+                    self.timer.mark('first_prediction')
+                    print(self.timer.summary())
                 
                 # Draw prediction on frame
                 cv2.putText(
@@ -111,14 +177,43 @@ class LiveDetector:
                     (0, 255, 0), 
                     2
                 )
-        else:
-            self.letter_label.configure(text="Detected Letter: -")
+        elif self.smoother is not None:
+            self.smoother.reset()
+        return frame_rgb, predicted_letter, confidence
+
+    def update_frame(self):
+        """Tk thread: show the newest processed frame"""
+        if self.load_progress is not None:
+            self.poll_loader()
+        if self.pipeline.error:
+            print(f"Error: {self.pipeline.error}")
+            self.stats_label.configure(text=self.pipeline.error)
+            return
         
-        # Convert frame to PhotoImage and display
-        image = Image.fromarray(frame_rgb)
-        photo = ImageTk.PhotoImage(image=image)
-        self.video_label.configure(image=photo)
-        self.video_label.image = photo
+        result = self.pipeline.latest()
+        if result is not None:
+            started = time.perf_counter()
+            frame_rgb, predicted_letter, confidence = result
+            self.timer.mark('first_frame')
+            
+            # Update letter label
+            if predicted_letter is None:
+                self.letter_label.configure(text="Detected Letter: -")
+            else:
+                self.letter_label.configure(text=f"Detected Letter: {predicted_letter} ({confidence:.0%})")
+            
+            # Convert frame to PhotoImage and display
+            image = Image.fromarray(frame_rgb)
+            photo = ImageTk.PhotoImage(image=image)
+            self.video_label.configure(image=photo)
+            self.video_label.image = photo
+            self.pipeline.stats['render'].record(started)
+            stats = self.pipeline.summary()
+            if self.hands is not None:
+                stats += f"\n{self.hands.summary()}"
+            if self.smoother is not None:
+                stats += f"\n{self.smoother.summary()}"
+            self.stats_label.configure(text=stats)
         
         # Schedule the next update
         self.window.after(10, self.update_frame)
@@ -127,6 +222,9 @@ class LiveDetector:
         self.window.mainloop()
         
     def cleanup(self):
+        self.pipeline.stop()
+        if self.hands is not None:
+            self.hands.close()
         if self.cap is not None:
             self.cap.release()
         cv2.destroyAllWindows()
@@ -0,0 +1,241 @@
+"""Search forest sizes/depths and other lightweight classifiers for the landmark features.
+
+Every candidate is scored with stratified k-fold cross-validation, the
+(candidate, fold) fits spread over a process pool. Each candidate is then
+refit on all samples and measured in this process, one at a time so timings
+don't compete: single-sample predict_proba latency (what the live apps pay
+per frame), batch throughput and size. Random forests are measured as the
+compiled .npz the apps actually load (startup.load_model_fast), everything
+else as its pickle. The report marks the Pareto
+front over accuracy, latency and size, and the chosen model is saved like
+train_classifier.py saves one, so every app can load it.
+"""
+import os
+import json
+import time
+import pickle
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+
+from feature_store import load_dataset
+from compiled_forest import export_forest, CompiledForest
+from timing import percentiles, time_each
+from features import convert_features, parse_labels, MINSHIFT_XY, RAW_XYZ
+from train_classifier import spec_for_classes, save_model
+
+FAMILIES = ['rf', 'knn', 'logreg', 'hgb', 'mlp']
+
+# Fold data, set once per worker process
+_X = None
+_y = None
+
+
+def build_candidates(families, seed=None):
+    """{name: unfitted estimator} for the requested families, all single-threaded"""
+    from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    candidates = {}
+    if 'rf' in families:
+        for n_estimators in (25, 50, 100, 200):
+            for max_depth in (None, 20, 10):
+                name = f"rf-{n_estimators}-d{max_depth or 'max'}"
+                candidates[name] = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                                          n_jobs=1, random_state=seed)
+    if 'knn' in families:
+        for k in (1, 3, 5, 9):
+            candidates[f'knn-{k}'] = KNeighborsClassifier(n_neighbors=k, n_jobs=1)
+    if 'logreg' in families:
+        for C in (0.1, 1.0, 10.0):
+            candidates[f'logreg-C{C:g}'] = make_pipeline(StandardScaler(), LogisticRegression(C=C, max_iter=2000))
+    if 'hgb' in families:
+        for max_iter in (50, 150):
+            candidates[f'hgb-{max_iter}'] = HistGradientBoostingClassifier(max_iter=max_iter, early_stopping=False,
+                                                                          random_state=seed)
+    if 'mlp' in families:
+        for hidden in ((32,), (64,), (64, 32)):
+            name = 'mlp-' + 'x'.join(str(size) for size in hidden)
+            candidates[name] = make_pipeline(StandardScaler(),
+                                             MLPClassifier(hidden, max_iter=500, early_stopping=True,
+                                                           random_state=seed))
+    return candidates
+
+
+def _init_worker(X, y):
+    global _X, _y
+    from threadpoolctl import threadpool_limits
+    # The pool already uses every core; OpenMP (HistGradientBoosting) and BLAS
+    # (scaler, logistic, MLP) threads on top would oversubscribe it and skew fit_s
+    threadpool_limits(1)
+    _X, _y = X, y
+
+
+def _score_fold(estimator, train, test):
+    started = time.perf_counter()
+    model = clone(estimator).fit(_X[train], _y[train])
+    fit_seconds = time.perf_counter() - started
+    return float((model.predict(_X[test]) == _y[test]).mean()), fit_seconds
+
+
+def _fit_all(estimator):
+    return clone(estimator).fit(_X, _y)
+
+
+def cross_validate(candidates, X, y, folds, workers, seed=None):
+    """({name: [(accuracy, fit seconds) per fold]}, {name: model refit on all samples})"""
+    splits = list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+    scores = {name: [] for name in candidates}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as executor:
+        futures = [(name, executor.submit(_score_fold, estimator, train, test))
+                   for name, estimator in candidates.items() for train, test in splits]
+        fitted = {name: executor.submit(_fit_all, estimator) for name, estimator in candidates.items()}
+        for name, future in futures:
+            scores[name].append(future.result())
+        models = {name: future.result() for name, future in fitted.items()}
+    return scores, models
+
+
+def is_forest(model):
+    from sklearn.ensemble import RandomForestClassifier
+    return isinstance(model, RandomForestClassifier)
+
+
+def measure(model, X, rows=200, batch_size=256):
+    """Single-sample latency, batch throughput and size of a fitted model, in the form the apps run it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        if is_forest(model):
+            path = os.path.join(tmp, 'model.npz')
+            export_forest(model, path)
+            runtime, size = CompiledForest(path), os.path.getsize(path)
+        else:
+            runtime, size = model, len(pickle.dumps(model))
+    singles = [X[i:i + 1] for i in range(min(rows, len(X)))]
+    single = percentiles(time_each(runtime.predict_proba, singles))
+    batch = X[:batch_size]
+    batch_stats = percentiles(time_each(runtime.predict_proba, [batch] * 20), count=20 * len(batch))
+    return {
+        'runtime': 'compiled' if runtime is not model else 'sklearn',
+        'latency_p50_us': round(single['p50_ms'] * 1000, 1),
+        'latency_p95_us': round(single['p95_ms'] * 1000, 1),
+        'batch_per_s': batch_stats['throughput_per_s'],
+        'size_kb': round(size / 1024, 1),
+    }
+
+
+def pareto_front(results):
+    """Names of candidates no other candidate beats on accuracy, latency and size at once"""
+    def dominates(a, b):
+        better_or_equal = (a['accuracy'] >= b['accuracy'] and a['latency_p50_us'] <= b['latency_p50_us']
+                           and a['size_kb'] <= b['size_kb'])
+        strictly = (a['accuracy'] > b['accuracy'] or a['latency_p50_us'] < b['latency_p50_us']
+                    or a['size_kb'] < b['size_kb'])
+        return better_or_equal and strictly
+    return {name for name, row in results.items()
+            if not any(dominates(other, row) for other in results.values() if other is not row)}
+
+
+def choose(results, front, pick, tolerance):
+    """'accuracy': most accurate. 'fastest': lowest latency on the Pareto front within
+    `tolerance` of the best accuracy. Anything else is taken as a candidate name."""
+    if pick == 'accuracy':
+        return max(results, key=lambda name: (results[name]['accuracy'], -results[name]['latency_p50_us']))
+    if pick == 'fastest':
+        best = max(row['accuracy'] for row in results.values())
+        eligible = [name for name in front if results[name]['accuracy'] >= best - tolerance]
+        return min(eligible, key=lambda name: results[name]['latency_p50_us'])
+    if pick not in results:
+        raise SystemExit(f"Unknown candidate {pick!r}; choose from {', '.join(results)}")
+    return pick
+
+
+def print_report(results, front, chosen):
+    print(f"{'candidate':16s} {'accuracy':>14s} {'1-row us':>9s} {'batch/s':>10s} {'size KB':>9s} {'fit s':>7s}")
+    for name, row in sorted(results.items(), key=lambda item: -item[1]['accuracy']):
+        mark = ('*' if name in front else ' ') + ('<' if name == chosen else '')
+        print(f"{name:16s} {row['accuracy']:8.4f}±{row['accuracy_std']:.3f} {row['latency_p50_us']:9.1f} "
+              f"{row['batch_per_s'] or 0:10.0f} {row['size_kb']:9.1f} {row['fit_s']:7.2f} {mark}")
+    print("* Pareto front (accuracy / latency / size), < chosen")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate candidate classifiers and export the best trade-off")
+    parser.add_argument('--data', default='./data.pickle', help="Dataset pickle or FeatureStore directory")
+    parser.add_argument('--families', nargs='+', choices=FAMILIES, default=FAMILIES)
+    parser.add_argument('--layout', choices=[MINSHIFT_XY, RAW_XYZ], default=None,
+                        help="Search on this feature layout, derived from the dataset's rows (default: as stored)")
+    parser.add_argument('--labels', type=parse_labels, default={},
+                        help="Override the text shown per class, e.g. 0=A,1=B,2=L")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="Processes for the CV fits (default: all cores)")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Search on a stratified sample of at most this many samples")
+    parser.add_argument('--pick', default='fastest',
+                        help="'fastest' (default), 'accuracy' or a candidate name, e.g. rf-50-d20")
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="With --pick fastest: accuracy that may be given up for speed")
+    parser.add_argument('--output', default=None, help="Save the chosen model here")
+    parser.add_argument('--compiled', default=None,
+                        help="Also export the chosen model as a compiled forest (.npz), if it is one")
+    parser.add_argument('--report', default=None, help="Write the results as JSON to this file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    X, y, classes, data_spec = load_dataset(args.data, with_spec=True)
+    spec = spec_for_classes(data_spec, classes, args.layout, args.labels)
+    y = np.asarray(y)
+    total = len(y)
+    if args.limit and args.limit < len(y):
+        from sklearn.model_selection import train_test_split
+        keep, _ = train_test_split(np.arange(len(y)), train_size=args.limit, stratify=y, random_state=args.seed)
+        keep = np.sort(keep)
+        X, y = X[keep], y[keep]
+    X = np.ascontiguousarray(convert_features(X, data_spec, spec), dtype=np.float32)
+
+    candidates = build_candidates(args.families, args.seed)
+    workers = args.workers or os.cpu_count()
+    print(f"{len(candidates)} candidates x {args.folds} folds on {len(y)} samples, {workers} processes")
+    started = time.perf_counter()
+    scores, models = cross_validate(candidates, X, y, args.folds, workers, args.seed)
+    print(f"Cross-validation took {time.perf_counter() - started:.1f}s")
+
+    results = {}
+    for name, folds in scores.items():
+        accuracy = [score for score, _ in folds]
+        results[name] = {'accuracy': round(float(np.mean(accuracy)), 4),
+                         'accuracy_std': round(float(np.std(accuracy)), 4),
+                         'fit_s': round(float(np.mean([seconds for _, seconds in folds])), 3),
+                         **measure(models[name], X)}
+    front = pareto_front(results)
+    chosen = choose(results, front, args.pick, args.tolerance)
+    print_report(results, front, chosen)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'data': args.data, 'samples': len(y), 'folds': args.folds, 'chosen': chosen,
+                       'pareto': sorted(front), 'candidates': results}, f, indent=2)
+
+    if args.output:
+        model = models[chosen]
+        # A --limit subsample is scattered over the dataset, so no row offset marks where unseen
+        # samples start; train_classifier.py --update then needs an explicit --since
+        save_model(args.output, model, classes, spec, None if len(y) < total else total)
+        print(f"Saved {chosen} to {args.output}")
+        if args.compiled:
+            if is_forest(model):
+                export_forest(model, args.compiled, spec)
+                print(f"Compiled forest written to {args.compiled}")
+            else:
+                print(f"{chosen} is not a random forest, skipping --compiled")
+
+
+if __name__ == "__main__":
+    main()
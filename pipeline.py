@@ -0,0 +1,137 @@
+import time
+import threading
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer"""
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest queued item, or None if nothing arrived within timeout"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def get_latest(self):
+        """Newest item without waiting, discarding anything older"""
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+
+class StageStats:
+    """Latency (exponential moving average, ms) and throughput of one pipeline stage"""
+
+    def __init__(self, name, smoothing=0.1):
+        self.name = name
+        self.smoothing = smoothing
+        self.latency_ms = 0.0
+        self.fps = 0.0
+        self.count = 0
+        self._last = None
+
+    def record(self, started):
+        now = time.perf_counter()
+        latency = (now - started) * 1000
+        if self.count == 0:
+            self.latency_ms = latency
+        else:
+            self.latency_ms += self.smoothing * (latency - self.latency_ms)
+        if self._last is not None and now > self._last:
+            rate = 1.0 / (now - self._last)
+            self.fps = rate if self.count == 1 else self.fps + self.smoothing * (rate - self.fps)
+        self._last = now
+        self.count += 1
+
+    def __str__(self):
+        return f"{self.name} {self.latency_ms:.1f} ms @ {self.fps:.1f} fps"
+
+
+class DetectionPipeline:
+    """Capture -> detect/classify -> render pipeline.
+
+    A capture thread reads frames from `read_frame` and a worker thread runs
+    `process(frame)` on them; the two are joined by small drop-oldest queues so
+    a slow stage never builds up latency. The GUI thread calls latest() to get
+    the newest processed result and records its own render time with
+    stats['render'].
+    """
+
+    def __init__(self, read_frame, process, queue_size=2):
+        self.read_frame = read_frame
+        self.process = process
+        self.frames = DropOldestQueue(queue_size)
+        self.results = DropOldestQueue(queue_size)
+        self.stats = {name: StageStats(name) for name in ('capture', 'process', 'render')}
+        self.error = None
+        self._running = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._threads = [threading.Thread(target=self._capture_loop, daemon=True),
+                         threading.Thread(target=self._process_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running.clear()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def latest(self):
+        return self.results.get_latest()
+
+    def summary(self):
+        dropped = self.frames.dropped + self.results.dropped
+        return " | ".join(str(stats) for stats in self.stats.values()) + f" | dropped {dropped}"
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            started = time.perf_counter()
+            frame = self.read_frame()
+            if frame is None:
+                self.error = "Could not read frame"
+                self._running.clear()
+                break
+            self.stats['capture'].record(started)
+            self.frames.put(frame)
+
+    def _process_loop(self):
+        while self._running.is_set():
+            frame = self.frames.get(timeout=0.1)
+            if frame is None:
+                continue
+            started = time.perf_counter()
+            try:
+                result = self.process(frame)
+            except Exception as e:
+                self.error = f"Processing error: {e}"
+                self._running.clear()
+                break
+            self.stats['process'].record(started)
+            self.results.put(result)
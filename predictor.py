@@ -0,0 +1,118 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchPredictor:
+    """Batched front-end for a fitted classifier (model.p / modelwords.p).
+
+    predict() classifies a whole batch with a single predict_proba call and
+    returns labels plus confidences. submit() is for many producers (cameras,
+    sessions, buffered frames): requests are queued and a worker thread groups
+    them into batches of at most max_batch_size, waiting at most max_wait
+    seconds for a batch to fill, so the per-call overhead of scikit-learn is
+    paid once per batch instead of once per frame.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait=0.005):
+        self.model = model
+        self.classes = np.asarray(model.classes_)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.calls = 0
+        self.samples = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def predict_proba(self, features):
+        """Class probabilities (columns follow self.classes) for a batch of feature vectors"""
+        X = np.asarray(features, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        proba = self.model.predict_proba(X)
+        with self._lock:
+            self.calls += 1
+            self.samples += len(X)
+        return proba
+
+    def predict(self, features):
+        """Return (labels, confidences) for a 2-D batch of feature vectors"""
+        proba = self.predict_proba(features)
+        best = proba.argmax(axis=1)
+        return self.classes[best], proba[np.arange(len(proba)), best]
+
+    def predict_one(self, feature_vector):
+        labels, confidences = self.predict([feature_vector])
+        return labels[0], float(confidences[0])
+
+    def submit(self, feature_vector, with_proba=False):
+        """Queue one feature vector.
+
+        The Future resolves to (label, confidence), or to the full probability
+        row when with_proba is set.
+        """
+        if self._worker is None:
+            self.start()
+        future = Future()
+        self._queue.put((np.asarray(feature_vector, dtype=np.float32), with_proba, future))
+        return future
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def close(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def mean_batch_size(self):
+        return self.samples / self.calls if self.calls else 0.0
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let the run loop see the stop marker
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = self._collect(item)
+            try:
+                proba = self.predict_proba(np.stack([vector for vector, _, _ in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            best = proba.argmax(axis=1)
+            for row, (_, with_proba, future) in enumerate(batch):
+                if with_proba:
+                    future.set_result(proba[row])
+                else:
+                    future.set_result((self.classes[best[row]], float(proba[row, best[row]])))
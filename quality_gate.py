@@ -0,0 +1,87 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+from features import hands_to_array, minshift_xy
+
+REASONS = ('accepted', 'no_hand', 'low_confidence', 'blurry', 'duplicate')
+
+
+def _hand_scores(results, count):
+    if not results.multi_handedness:
+        return [1.0] * count
+    return [handedness.classification[0].score for handedness in results.multi_handedness[:count]]
+
+
+def sharpness(frame_bgr, hands, margin=0.1):
+    """Variance of the Laplacian over the hand region; low values mean motion blur"""
+    h, w = frame_bgr.shape[:2]
+    xy = hands[:, :, :2].reshape(-1, 2)
+    (min_x, min_y), (max_x, max_y) = xy.min(axis=0), xy.max(axis=0)
+    pad_x, pad_y = (max_x - min_x) * margin, (max_y - min_y) * margin
+    x1, y1 = max(0, int((min_x - pad_x) * w)), max(0, int((min_y - pad_y) * h))
+    x2, y2 = min(w, int((max_x + pad_x) * w)), min(h, int((max_y + pad_y) * h))
+    if x2 - x1 < 4 or y2 - y1 < 4:
+        return 0.0
+    gray = cv2.cvtColor(frame_bgr[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+class QualityGate:
+    """Decides whether a collected frame is worth keeping.
+
+    check() takes the frame and the hand detection result the caller already
+    has for it. A frame is rejected when no hand was found, a handedness
+    score is below min_score, the hand region is blurry (Laplacian variance
+    below min_sharpness), or its pose differs from one of the last `history`
+    accepted poses by less than min_pose_change (mean absolute difference of
+    translation- and scale-normalised x/y landmarks).
+    """
+
+    def __init__(self, min_score=0.8, min_sharpness=50.0, min_pose_change=0.01, history=10, max_hands=1):
+        self.min_score = min_score
+        self.min_sharpness = min_sharpness
+        self.min_pose_change = min_pose_change
+        self.max_hands = max_hands
+        self.counts = dict.fromkeys(REASONS, 0)
+        self._recent = deque(maxlen=history)
+
+    def check(self, frame_bgr, results):
+        """Return (accepted, reason, hands); hands is the (n, 21, 3) landmark array"""
+        hands = hands_to_array(results.multi_hand_landmarks, self.max_hands)
+        reason = self._reason(frame_bgr, results, hands)
+        self.counts[reason] += 1
+        return reason == 'accepted', reason, hands
+
+    def _reason(self, frame_bgr, results, hands):
+        if len(hands) == 0:
+            return 'no_hand'
+        if min(_hand_scores(results, len(hands))) < self.min_score:
+            return 'low_confidence'
+        if sharpness(frame_bgr, hands) < self.min_sharpness:
+            return 'blurry'
+        pose = minshift_xy(hands, normalize_scale=True)
+        for previous in self._recent:
+            if len(previous) == len(pose) and np.abs(previous - pose).mean() < self.min_pose_change:
+                return 'duplicate'
+        self._recent.append(pose)
+        return 'accepted'
+
+    @property
+    def checked(self):
+        return sum(self.counts.values())
+
+    @property
+    def acceptance_rate(self):
+        return self.counts['accepted'] / self.checked if self.checked else 0.0
+
+    def reset(self):
+        self.counts = dict.fromkeys(REASONS, 0)
+        self._recent.clear()
+
+    def summary(self):
+        rejected = ", ".join(f"{reason.replace('_', ' ')} {self.counts[reason]}"
+                             for reason in REASONS[1:] if self.counts[reason])
+        text = f"accepted {self.counts['accepted']}/{self.checked} ({self.acceptance_rate:.0%})"
+        return f"{text} | rejected: {rejected}" if rejected else text
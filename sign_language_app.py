@@ -1,24 +1,34 @@
 import tkinter as tk
-from tkinter import ttk
 import cv2
-import os
-import pickle
-import mediapipe as mp
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
 import customtkinter as ctk
 from PIL import Image, ImageTk
 
+# mediapipe and scikit-learn are imported on demand: the hand tracker and the
+# model are loaded in the background after the window is up, and training
+# runs in a separate process
+from startup import StartupTimer, BackgroundLoader, load_model_fast, warm_up
+from training import BackgroundTrainer, LANDMARK_STORE_PATH
+from image_writer import ImageWriter
+from landmark_collector import LandmarkCollector
+from quality_gate import QualityGate
+from features import hands_to_array, model_spec, spec_features, spec_label, RAW_XYZ
+from predictor import BatchPredictor
+from smoothing import PredictionSmoother
+from decoder import LetterStreamDecoder
+from translation import TranslationService, LANGUAGE_NAMES, language_code
+from sign_translation import SignTranslationPipeline
+
 class SignLanguageApp:
     def __init__(self):
+        self.timer = StartupTimer()
         self.app = ctk.CTk()
         self.app.title("Sign Language Detector")
         self.app.geometry("1200x800")
         
-        # Initialize mediapipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=False, max_num_hands=1)
-        self.mp_draw = mp.solutions.drawing_utils
+        # Filled in by the background loader
+        self.mp_hands = None
+        self.mp_draw = None
+        self.tracker = None
         
         # Initialize variables
         self.current_letter = 0
@@ -27,9 +37,61 @@ class SignLanguageApp:
         self.is_collecting = False
         self.is_detecting = False
         self.model = None
+        self.spec = None
+        self.predictor = None
+        self.smoother = None
+        self.decoder = None
+        self.translation = None
+        self.translation_service = None  # one batching thread and cache for the app's lifetime
+        self.trainer = None
+        self.writer = None
+        self.collector = None
+        self.gate = None
         self.cap = None
         
         self.setup_gui()
+        self.timer.mark('window')
+        
+        # Load the model and the MediaPipe graph without blocking the window
+        self.loader = BackgroundLoader([
+            ('model', "Loading model", lambda: load_model_fast('model.p')),
+            ('hands', "Starting hand tracker", self.create_tracker),
+            ('warmup', "Warming up", self.warm_up),
+        ], self.timer).start()
+        self.poll_loader()
+        
+    def create_tracker(self):
+        import mediapipe as mp
+        from tracking import HandTracker
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+        return HandTracker(max_num_hands=1)
+        
+    def warm_up(self):
+        model = self.loader.results.get('model')
+        tracker = self.loader.results.get('hands')
+        predictor = BatchPredictor(model) if model is not None else None
+        warm_up(tracker, predictor, model.n_features_in_ if model is not None else None)
+        return predictor
+        
+    def poll_loader(self):
+        self.load_progress.set(self.loader.progress)
+        if not self.loader.finished:
+            self.load_label.configure(text=self.loader.status())
+            self.app.after(50, self.poll_loader)
+            return
+        
+        self.tracker = self.loader.results.get('hands')
+        if self.model is None and 'model' in self.loader.results:
+            self.swap_model(self.loader.results['model'], self.loader.results.get('warmup'))
+        self.load_progress.pack_forget()
+        if self.tracker is None:
+            # Collection and detection both need the hand tracker
+            self.load_label.configure(text=self.loader.status())
+            return
+        self.load_label.configure(text=self.timer.summary())
+        self.collect_btn.configure(state="normal")
+        self.detect_btn.configure(state="normal")
         
     def setup_gui(self):
         # Create main frames
@@ -63,9 +125,21 @@ class SignLanguageApp:
         btn_frame = ctk.CTkFrame(collection_frame)
         btn_frame.pack(pady=5, fill=tk.X)
         
-        self.collect_btn = ctk.CTkButton(btn_frame, text="Start Collection", command=self.toggle_collection)
+        self.collect_btn = ctk.CTkButton(btn_frame, text="Start Collection", command=self.toggle_collection,
+                                         state="disabled")
         self.collect_btn.pack(side=tk.LEFT, padx=5)
         
+        # Skip blurry, low-confidence and repeated poses; keep landmarks with each image
+        self.gate_var = tk.BooleanVar(value=True)
+        ctk.CTkCheckBox(collection_frame, text="Quality gate", variable=self.gate_var).pack(pady=5)
+        
+        # Full images, or just the landmarks the model is trained on
+        save_frame = ctk.CTkFrame(collection_frame)
+        save_frame.pack(pady=5, fill=tk.X)
+        self.save_var = tk.StringVar(value="Images")
+        ctk.CTkLabel(save_frame, text="Save:").pack(side=tk.LEFT, padx=5)
+        ctk.CTkOptionMenu(save_frame, values=["Images", "Landmarks only"], variable=self.save_var).pack(side=tk.LEFT, padx=5)
+        
         # Training Controls
         training_frame = ctk.CTkFrame(self.control_frame)
         training_frame.pack(pady=10, padx=5, fill=tk.X)
@@ -75,19 +149,51 @@ class SignLanguageApp:
         self.train_btn = ctk.CTkButton(training_frame, text="Train Model", command=self.train_model)
         self.train_btn.pack(pady=5)
         
+        # Shown while a training run is in progress
+        self.train_progress = ctk.CTkProgressBar(training_frame)
+        
         # Detection Controls
         detection_frame = ctk.CTkFrame(self.control_frame)
         detection_frame.pack(pady=10, padx=5, fill=tk.X)
         
         ctk.CTkLabel(detection_frame, text="Live Detection", font=("Arial", 16, "bold")).pack(pady=5)
         
-        self.detect_btn = ctk.CTkButton(detection_frame, text="Start Detection", command=self.toggle_detection)
+        self.detect_btn = ctk.CTkButton(detection_frame, text="Start Detection", command=self.toggle_detection,
+                                        state="disabled")
         self.detect_btn.pack(pady=5)
         
+        # Decoded text from the letter stream
+        self.transcript_label = ctk.CTkLabel(detection_frame, text="Text: ", wraplength=220, justify=tk.LEFT)
+        self.transcript_label.pack(pady=5)
+        
+        self.clear_text_btn = ctk.CTkButton(detection_frame, text="Clear Text", command=self.clear_transcript)
+        self.clear_text_btn.pack(pady=5)
+        
+        # Live translation of the decoded text
+        translate_frame = ctk.CTkFrame(detection_frame)
+        translate_frame.pack(pady=5, fill=tk.X)
+        
+        self.translate_var = tk.StringVar(value="Off")
+        ctk.CTkLabel(translate_frame, text="Translate to:").pack(side=tk.LEFT, padx=5)
+        translate_menu = ctk.CTkOptionMenu(translate_frame, values=["Off"] + LANGUAGE_NAMES,
+                                           variable=self.translate_var, command=self.change_translation_language)
+        translate_menu.pack(side=tk.LEFT, padx=5)
+        
+        self.translation_label = ctk.CTkLabel(detection_frame, text="", wraplength=220, justify=tk.LEFT)
+        self.translation_label.pack(pady=5)
+        
         # Status
         self.status_label = ctk.CTkLabel(self.control_frame, text="Ready", font=("Arial", 12))
         self.status_label.pack(pady=10)
         
+        # Background loading progress
+        self.load_progress = ctk.CTkProgressBar(self.control_frame)
+        self.load_progress.set(0)
+        self.load_progress.pack(pady=5, padx=5, fill=tk.X)
+        self.load_label = ctk.CTkLabel(self.control_frame, text="Starting...", font=("Arial", 11),
+                                       wraplength=220, justify=tk.LEFT)
+        self.load_label.pack(pady=5)
+        
         # Video display
         self.video_label = ctk.CTkLabel(self.video_frame, text="")
         self.video_label.pack(expand=True)
@@ -113,61 +219,108 @@ class SignLanguageApp:
         self.current_letter = ord(self.letter_var.get()) - 65
         self.counter = 0
         
-        # Create directory if it doesn't exist
-        folder_path = os.path.join('./data', str(self.current_letter))
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
+        # Frames are JPEG-encoded and written to ./data/<letter>/ on background threads,
+        # or only their landmarks (plus a thumbnail) are appended to the landmark store
+        if self.save_var.get() == "Landmarks only":
+            if self.collector is None:
+                self.collector = LandmarkCollector(LANDMARK_STORE_PATH, RAW_XYZ, max_hands=1, thumbnail_size=96)
+        elif self.writer is None:
+            self.writer = ImageWriter('./data')
+        self.gate = QualityGate() if self.gate_var.get() else None
             
         self.update_frame()
         
     def stop_collection(self):
         self.is_collecting = False
         self.collect_btn.configure(text="Start Collection")
+        if self.collector is not None:
+            self.collector.flush()  # the landmark store is trainable right away
         if self.cap is not None and not self.is_detecting:
             self.cap.release()
             self.cap = None
             
     def train_model(self):
-        self.update_status("Training model...")
-        try:
-            data_dict = {
-                'data': [],
-                'labels': []
-            }
-            
-            # Load the data
-            for i in range(26):  # A to Z
-                folder_path = os.path.join('./data', str(i))
-                if os.path.exists(folder_path):
-                    for img_name in os.listdir(folder_path):
-                        img_path = os.path.join(folder_path, img_name)
-                        img = cv2.imread(img_path)
-                        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        results = self.hands.process(img_rgb)
-                        
-                        if results.multi_hand_landmarks:
-                            landmarks = results.multi_hand_landmarks[0]
-                            data_point = []
-                            for lm in landmarks.landmark:
-                                data_point.extend([lm.x, lm.y, lm.z])
-                            data_dict['data'].append(data_point)
-                            data_dict['labels'].append(i)
-            
-            # Train the model
-            X = np.array(data_dict['data'])
-            y = np.array(data_dict['labels'])
+        # The same button cancels a training run in progress
+        if self.trainer is not None and self.trainer.running:
+            self.trainer.cancel()
+            self.train_btn.configure(state="disabled")
+            return
+        if self.writer is not None:
+            self.writer.flush()  # every collected image must be on disk first
+        if self.collector is not None:
+            self.collector.flush()
+        self.trainer = BackgroundTrainer(data_dir='./data', model_path='model.p').start()
+        self.train_btn.configure(text="Cancel Training")
+        self.train_progress.set(0)
+        self.train_progress.pack(pady=5, padx=5, fill=tk.X)
+        self.poll_training()
+        
+    def poll_training(self):
+        state = self.trainer.poll()
+        self.train_progress.set(self.trainer.progress)
+        self.update_status(self.trainer.status())
+        if state == 'running':
+            self.app.after(100, self.poll_training)
+            return
+        
+        self.train_progress.pack_forget()
+        self.train_btn.configure(text="Train Model", state="normal")
+        if state == 'done':
+            self.swap_model(load_model_fast('model.p'))
             
-            self.model = RandomForestClassifier()
-            self.model.fit(X, y)
+    def swap_model(self, model, predictor=None):
+        """Replace the running detector's model without restarting"""
+        old_predictor = self.predictor
+        self.model = model
+        self.spec = model_spec(model)
+        self.predictor = predictor or BatchPredictor(model)
+        self.smoother = PredictionSmoother(self.predictor.classes)
+        self.decoder = None  # rebuilt for the new letter set on the next frame
+        if old_predictor is not None:
+            old_predictor.close()
             
-            # Save the model
-            with open('model.p', 'wb') as f:
-                pickle.dump({'model': self.model}, f)
+    def clear_transcript(self):
+        if self.decoder is not None:
+            self.decoder.clear()
+        if self.translation is not None:
+            self.translation.clear()
+        self.transcript_label.configure(text="Text: ")
+        self.translation_label.configure(text="")
+        
+    def update_transcript(self, proba):
+        if self.decoder is None:
+            letters = [spec_label(self.spec, c) for c in self.predictor.classes]
+            self.decoder = LetterStreamDecoder(letters)
+        events = self.decoder.update(proba)
+        if events:
+            self.transcript_label.configure(text=f"Text: {self.decoder.text}")
+            if self.translation is not None:
+                self.translation.on_events(events)
                 
-            self.update_status("Model trained successfully!")
+    def change_translation_language(self, language_name):
+        if language_name == "Off":
+            if self.translation is not None:
+                self.translation.clear()
+            self.translation = None
+            self.translation_label.configure(text="")
+            return
+        lang_code = language_code(language_name)
+        if self.translation is None:
+            if self.translation_service is None:
+                self.translation_service = TranslationService()
+            self.translation = SignTranslationPipeline(self.translation_service, lang_code)
+            self.poll_translation()
+        else:
+            self.translation.set_language(lang_code)
             
-        except Exception as e:
-            self.update_status(f"Training error: {str(e)}")
+    def poll_translation(self):
+        if self.translation is None:
+            return
+        if self.translation.poll():
+            latency = self.translation.last_latency_ms
+            self.translation_label.configure(
+                text=f"{self.translation.text}\n(sign to text: {latency:.0f} ms)")
+        self.app.after(100, self.poll_translation)
             
     def toggle_detection(self):
         if not self.is_detecting:
@@ -178,10 +331,8 @@ class SignLanguageApp:
     def start_detection(self):
         if self.model is None:
             try:
-                with open('model.p', 'rb') as f:
-                    data = pickle.load(f)
-                    self.model = data['model']
-            except:
+                self.swap_model(load_model_fast('model.p'))
+            except Exception:
                 self.update_status("Error: No trained model found")
                 return
                 
@@ -202,6 +353,29 @@ class SignLanguageApp:
             self.cap.release()
             self.cap = None
             
+    def collect_frame(self, frame, results):
+        """Queue the clean frame (before landmarks are drawn on it) if it passes the quality gate"""
+        status = ""
+        if self.gate is None:
+            hands = hands_to_array(results.multi_hand_landmarks, 1)
+            accepted = len(hands) > 0
+        else:
+            accepted, reason, hands = self.gate.check(frame, results)
+            status = f" ({reason.replace('_', ' ')})\n{self.gate.summary()}"
+        sink = self.collector if self.save_var.get() == "Landmarks only" else self.writer
+        if accepted and sink is self.collector:
+            accepted = self.collector.add(frame, self.current_letter, hands)
+        elif accepted:
+            self.writer.put(frame, self.current_letter, f'{self.counter}.jpg', landmarks=hands)
+        self.counter += int(accepted)
+        status += f"\n{sink.summary()}"
+        
+        if self.counter >= self.dataset_size:
+            self.stop_collection()
+            self.update_status(f"Finished collecting images for {self.letter_var.get()}{status}")
+        else:
+            self.update_status(f"Collecting {self.letter_var.get()}: {self.counter}/{self.dataset_size}{status}")
+            
     def update_frame(self):
         if self.cap is None:
             return
@@ -212,39 +386,43 @@ class SignLanguageApp:
             return
             
         frame = cv2.flip(frame, 1)  # Mirror the image
+        self.timer.mark('first_frame')
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+        results = self.tracker.process(frame_rgb)
         
+        collecting_frame = self.is_collecting
+        if collecting_frame:
+            self.collect_frame(frame, results)
+            
         if results.multi_hand_landmarks:
             landmarks = results.multi_hand_landmarks[0]
             self.mp_draw.draw_landmarks(frame, landmarks, self.mp_hands.HAND_CONNECTIONS)
             
-            if self.is_collecting:
-                # Save image for training
-                img_path = os.path.join('./data', str(self.current_letter), f'{self.counter}.jpg')
-                cv2.imwrite(img_path, frame)
-                self.counter += 1
-                
-                if self.counter >= self.dataset_size:
-                    self.stop_collection()
-                    self.update_status(f"Finished collecting images for {self.letter_var.get()}")
+            if not collecting_frame and self.is_detecting and self.model is not None:
+                # Prepare data for prediction in the layout the model was trained on
+                data_point = spec_features(hands_to_array(results.multi_hand_landmarks), self.spec)
+                if data_point is None:
+                    self.update_status(f"Model expects {self.spec['max_hands']} hands")
                 else:
-                    self.update_status(f"Collecting {self.letter_var.get()}: {self.counter}/{self.dataset_size}")
-                    
-            elif self.is_detecting and self.model is not None:
-                # Prepare data for prediction
-                data_point = []
-                for lm in landmarks.landmark:
-                    data_point.extend([lm.x, lm.y, lm.z])
+                    # Make a smoothed prediction, skipping the classifier while the hand is still
+                    prediction, confidence = self.smoother.update(
+                        data_point, lambda features: self.predictor.predict_proba(features)[0])
+                    predicted_letter = spec_label(self.spec, prediction)
+                    if 'first_prediction' not in self.timer.marks:
+                        self.timer.mark('first_prediction')
+                        print(self.timer.summary())
                     
-                # Make prediction
-                prediction = self.model.predict([data_point])
-                predicted_letter = chr(65 + prediction[0])
-                
-                # Display prediction
-                cv2.putText(frame, predicted_letter, (50, 50),
-                           cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 2)
+                    # Display prediction
+                    cv2.putText(frame, predicted_letter, (50, 50),
+                               cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 2)
+                    self.update_status(self.smoother.summary())
+                    # The decoder scores spellings by probability; vote fractions are nearly one-hot
+                    self.update_transcript(self.smoother.mean_proba)
                 
+        elif self.is_detecting and self.smoother is not None:
+            self.smoother.reset()
+            self.update_transcript(None)
+            
         # Convert frame to PhotoImage and display
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         img = Image.fromarray(frame)
@@ -257,6 +435,15 @@ class SignLanguageApp:
             
     def run(self):
         self.app.mainloop()
+        if self.writer is not None:
+            self.writer.close()
+        if self.collector is not None:
+            self.collector.close()
+        if self.translation_service is not None:
+            self.translation_service.close()
+        if self.trainer is not None and self.trainer.running:
+            self.trainer.cancel()
+            self.trainer.process.join(timeout=10)
         if self.cap is not None:
             self.cap.release()
         cv2.destroyAllWindows()
@@ -0,0 +1,114 @@
+import time
+
+
+class SignTranslationPipeline:
+    """Feeds decoded words from the detector into a TranslationService.
+
+    Only the phrase being signed is (re)translated: finished sentences are
+    translated once and frozen until the target language changes. Word events restart a debounce timer, and the
+    current phrase is sent only after `debounce` seconds without new words.
+    A request that is overtaken by a newer version of the phrase is
+    cancelled. last_latency_ms is the time from the word or sentence event
+    to its translation becoming available.
+
+    Call on_events() with LetterStreamDecoder events and poll() regularly
+    from the UI loop; poll() returns True when the translated text changed.
+    """
+
+    def __init__(self, service, dest='es', debounce=0.6, clock=time.monotonic):
+        self.service = service
+        self.dest = dest
+        self.debounce = debounce
+        self.clock = clock
+        self.sentences = []      # [source, translation or None, future, event time]
+        self.words = []
+        self.phrase_translation = ''
+        self.last_latency_ms = None
+        self._phrase_dirty = False
+        self._last_word_at = None
+        self._phrase_future = None
+        self._phrase_sent_for = None
+
+    def set_language(self, dest):
+        if dest == self.dest:
+            return
+        self.dest = dest
+        # Finished sentences are translated again so the text stays in one language
+        now = self.clock()
+        for sentence in self.sentences:
+            if sentence[2] is not None:
+                sentence[2].cancel()
+            sentence[1:] = [None, self.service.translate(sentence[0], dest), now]
+        self._cancel_phrase()
+        self.phrase_translation = ''
+        self._phrase_dirty = bool(self.words)
+        self._last_word_at = self.clock() - self.debounce
+
+    def on_events(self, events):
+        now = self.clock()
+        for kind, text in events:
+            if kind == 'word':
+                self.words.append(text)
+                self._phrase_dirty = True
+                self._last_word_at = now
+            elif kind == 'sentence':
+                self._cancel_phrase()
+                self.sentences.append([text, None, self.service.translate(text, self.dest), now])
+                self.words = []
+                self.phrase_translation = ''
+                self._phrase_dirty = False
+
+    def poll(self):
+        changed = False
+        now = self.clock()
+        for sentence in self.sentences:
+            future = sentence[2]
+            if future is not None and future.done():
+                sentence[1] = self._result(future, sentence[0])
+                sentence[2] = None
+                self.last_latency_ms = (now - sentence[3]) * 1000
+                changed = True
+
+        if self._phrase_dirty and now - self._last_word_at >= self.debounce:
+            self._cancel_phrase()
+            phrase = ' '.join(self.words)
+            self._phrase_future = self.service.translate(phrase, self.dest)
+            self._phrase_sent_for = self._last_word_at
+            self._phrase_dirty = False
+
+        future = self._phrase_future
+        if future is not None and future.done():
+            self.phrase_translation = self._result(future, ' '.join(self.words))
+            self.last_latency_ms = (now - self._phrase_sent_for) * 1000
+            self._phrase_future = None
+            changed = True
+        return changed
+
+    @property
+    def text(self):
+        parts = [translation if translation is not None else '...' for _, translation, _, _ in self.sentences]
+        if self.phrase_translation:
+            parts.append(self.phrase_translation)
+        return ' '.join(parts)
+
+    def clear(self):
+        self._cancel_phrase()
+        for sentence in self.sentences:
+            if sentence[2] is not None:
+                sentence[2].cancel()
+        self.sentences = []
+        self.words = []
+        self.phrase_translation = ''
+        self._phrase_dirty = False
+
+    def _cancel_phrase(self):
+        if self._phrase_future is not None:
+            self._phrase_future.cancel()
+            self._phrase_future = None
+
+    @staticmethod
+    def _result(future, source):
+        try:
+            return future.result()
+        except Exception:
+            return source  # show the untranslated text rather than nothing
@@ -0,0 +1,102 @@
+import numpy as np
+
+VOTE = 'vote'
+EMA = 'ema'
+
+
+class PredictionSmoother:
+    """Streaming decision layer over per-frame class probabilities.
+
+    Keeps the last `window` probability vectors in a ring buffer and reports
+    either the majority vote over their argmaxes or an exponential moving
+    average (alpha weights the newest frame); the smoothed distribution is
+    kept in self.distribution. Before classifying, the landmark
+    features are compared with those of the last classified frame; while the
+    mean absolute change stays below motion_threshold the previous
+    probabilities are reused (for at most max_skip frames in a row), so a
+    still hand costs no classifier calls.
+    """
+
+    def __init__(self, classes, mode=VOTE, window=8, alpha=0.3, motion_threshold=0.004, max_skip=15):
+        if mode not in (VOTE, EMA):
+            raise ValueError(f"Unknown smoothing mode: {mode}")
+        self.classes = np.asarray(classes)
+        self.mode = mode
+        self.alpha = alpha
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.history = np.zeros((window, len(self.classes)))
+        self.filled = 0
+        self.position = 0
+        self.ema = None
+        self.distribution = None
+        self.last_features = None
+        self.last_proba = None
+        self.skipped_in_row = 0
+        self.calls = 0
+        self.saved = 0
+
+    def reset(self):
+        """Forget the history, e.g. when the hand leaves the frame"""
+        self.filled = 0
+        self.position = 0
+        self.ema = None
+        self.distribution = None
+        self.last_features = None
+        self.last_proba = None
+        self.skipped_in_row = 0
+
+    def update(self, features, classify):
+        """Feed one frame's features; classify(features) must return a probability vector.
+
+        Returns the smoothed (label, confidence), or (None, 0.0) with no hand.
+        """
+        if features is None:
+            self.reset()
+            return None, 0.0
+
+        features = np.asarray(features, dtype=np.float32)
+        if self._unchanged(features):
+            proba = self.last_proba
+            self.skipped_in_row += 1
+            self.saved += 1
+        else:
+            proba = np.asarray(classify(features), dtype=np.float64).reshape(-1)
+            self.last_features = features
+            self.last_proba = proba
+            self.skipped_in_row = 0
+            self.calls += 1
+
+        self.history[self.position] = proba
+        self.position = (self.position + 1) % len(self.history)
+        self.filled = min(self.filled + 1, len(self.history))
+
+        if self.mode == EMA:
+            self.ema = proba.copy() if self.ema is None else self.alpha * proba + (1 - self.alpha) * self.ema
+            self.distribution = self.ema
+        else:
+            votes = np.bincount(self.history[:self.filled].argmax(axis=1), minlength=len(self.classes))
+            self.distribution = votes / self.filled
+        best = int(self.distribution.argmax())
+        return self.classes[best], float(self.distribution[best])
+
+    @property
+    def mean_proba(self):
+        """Mean of the windowed classifier probabilities, or None before the first frame.
+
+        Unlike the vote distribution this keeps near-ties visible, which is
+        what a decoder scoring letter probabilities needs.
+        """
+        return self.history[:self.filled].mean(axis=0) if self.filled else None
+
+    def summary(self):
+        total = self.calls + self.saved
+        share = self.saved / total if total else 0.0
+        return f"classifier calls {self.calls}, saved {self.saved} ({share:.0%})"
+
+    def _unchanged(self, features):
+        if self.last_features is None or self.last_features.shape != features.shape:
+            return False
+        if self.skipped_in_row >= self.max_skip:
+            return False
+        return float(np.abs(features - self.last_features).mean()) < self.motion_threshold
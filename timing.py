@@ -0,0 +1,37 @@
+import sys
+import time
+import resource
+
+import numpy as np
+
+
+def percentiles(samples, count=None):
+    """Latency summary for a list of per-item durations in seconds"""
+    ms = np.asarray(samples) * 1000
+    count = count or len(samples)
+    total = float(np.sum(samples))
+    return {
+        'n': count,
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'mean_ms': round(float(ms.mean()), 4),
+        'throughput_per_s': round(count / total, 2) if total > 0 else None,
+    }
+
+
+def time_each(fn, items, warmup=3):
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
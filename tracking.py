@@ -0,0 +1,152 @@
+import cv2
+import mediapipe as mp
+
+
+class TrackingResults:
+    """Stand-in for a MediaPipe result with landmarks in full-frame coordinates"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+
+
+def _resize_to(image, max_side):
+    h, w = image.shape[:2]
+    return _scaled(image, max_side / max(h, w))
+
+
+def _scaled(image, scale):
+    if scale >= 1.0:
+        return image
+    h, w = image.shape[:2]
+    return cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _hand_score(results, index):
+    if not results.multi_handedness:
+        return 1.0
+    return results.multi_handedness[index].classification[0].score
+
+
+class HandTracker:
+    """Hand landmarks for live video without a full-frame search on every frame.
+
+    A full-frame detection pass (downscaled to detection_max_side) finds the
+    hand and fixes a square region of interest around it. Following frames
+    only run the video-mode Hands graph on that crop, so the palm detector
+    is skipped while MediaPipe keeps tracking. The crop is downscaled by how
+    big the hand was when the region was fixed: the smallest hand's box
+    ends up about hand_pixels wide, so a near hand is shrunk a lot and a far
+    or second small hand keeps its detail. Moving the region (re-centring on
+    a hand near the edge, or a new detection) resets the tracking graph,
+    whose landmarks from the previous crop no longer line up. The frame is
+    searched again when the hand is lost (MediaPipe drops it once its
+    tracking confidence falls below min_tracking_confidence), it drifts to
+    the edge of the crop, or every redetect_every frames. min_handedness_score
+    additionally rejects tracked hands whose left/right classification is
+    this unsure, which usually means the crop no longer shows a clear hand.
+
+    Each instance holds two Hands graphs, a static-image one for the
+    full-frame search and a video-mode one for tracking, so it costs about
+    twice the memory and load time of a single Hands object.
+
+    process() returns an object with multi_hand_landmarks/multi_handedness
+    whose landmarks are normalised to the full frame, like Hands.process.
+    """
+
+    def __init__(self, max_num_hands=1, redetect_every=30, min_tracking_confidence=0.6,
+                 min_handedness_score=0.6, margin=0.35,
+                 hand_pixels=160, detection_max_side=480, min_detection_confidence=0.5):
+        hands = mp.solutions.hands
+        self.detector = hands.Hands(static_image_mode=True, max_num_hands=max_num_hands,
+                                    min_detection_confidence=min_detection_confidence)
+        self.tracker = hands.Hands(static_image_mode=False, max_num_hands=max_num_hands,
+                                   min_detection_confidence=min_detection_confidence,
+                                   min_tracking_confidence=min_tracking_confidence)
+        self.redetect_every = redetect_every
+        self.min_handedness_score = min_handedness_score
+        self.margin = margin
+        self.hand_pixels = hand_pixels
+        self.detection_max_side = detection_max_side
+        self.roi = None
+        self.roi_scale = 1.0
+        self.frames_since_detection = 0
+        self.detections = 0
+        self.tracked = 0
+
+    def process(self, frame_rgb):
+        results = None
+        if self.roi is not None and self.frames_since_detection < self.redetect_every:
+            results = self._track(frame_rgb)
+        if results is None:
+            results = self._detect(frame_rgb)
+        self.frames_since_detection += 1
+        return results
+
+    def summary(self):
+        total = self.detections + self.tracked
+        share = self.tracked / total if total else 0.0
+        return f"tracked {self.tracked}/{total} frames ({share:.0%}) without a full-frame search"
+
+    def close(self):
+        self.detector.close()
+        self.tracker.close()
+
+    def _detect(self, frame_rgb):
+        self.detections += 1
+        self.frames_since_detection = 0
+        # Uniform downscaling keeps normalised landmark coordinates valid
+        results = self.detector.process(_resize_to(frame_rgb, self.detection_max_side))
+        if not results.multi_hand_landmarks:
+            self.roi = None
+            return TrackingResults()
+        self._move_roi(results.multi_hand_landmarks, frame_rgb.shape)
+        return TrackingResults(results.multi_hand_landmarks, results.multi_handedness)
+
+    def _track(self, frame_rgb):
+        x0, y0, x1, y1 = self.roi
+        crop = frame_rgb[y0:y1, x0:x1]
+        results = self.tracker.process(_scaled(crop, self.roi_scale))
+        hands = results.multi_hand_landmarks
+        if not hands or min(_hand_score(results, i) for i in range(len(hands))) < self.min_handedness_score:
+            return None
+
+        H, W = frame_rgb.shape[:2]
+        crop_w, crop_h = x1 - x0, y1 - y0
+        near_edge = False
+        for hand in hands:
+            for lm in hand.landmark:
+                near_edge |= not (0.05 < lm.x < 0.95 and 0.05 < lm.y < 0.95)
+                lm.x = (x0 + lm.x * crop_w) / W
+                lm.y = (y0 + lm.y * crop_h) / H
+                lm.z = lm.z * crop_w / W
+        if near_edge:
+            # Re-centre on the tracked hand instead of paying for a full search
+            self._move_roi(hands, frame_rgb.shape)
+        self.tracked += 1
+        return TrackingResults(hands, results.multi_handedness)
+
+    def _move_roi(self, multi_hand_landmarks, shape):
+        roi = self._roi_around(multi_hand_landmarks, shape)
+        if roi != self.roi:
+            # The graph tracks in crop coordinates; a shifted or resized crop invalidates them
+            self.tracker.reset()
+        H, W = shape[:2]
+        sides = []
+        for hand in multi_hand_landmarks:
+            xs = [lm.x * W for lm in hand.landmark]
+            ys = [lm.y * H for lm in hand.landmark]
+            sides.append(max(max(xs) - min(xs), max(ys) - min(ys)))
+        self.roi = roi
+        self.roi_scale = min(1.0, self.hand_pixels / max(min(sides), 1.0))
+
+    def _roi_around(self, multi_hand_landmarks, shape):
+        H, W = shape[:2]
+        xs = [lm.x * W for hand in multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y * H for hand in multi_hand_landmarks for lm in hand.landmark]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.margin)
+        side = min(max(side, 64), W, H)
+        x0 = int(min(max(cx - side / 2, 0), W - side))
+        y0 = int(min(max(cy - side / 2, 0), H - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
@@ -1,28 +1,231 @@
+"""Train the landmark classifier.
+
+By default the whole dataset is read and one forest is fit on all cores.
+With --chunk-size the samples are streamed instead: the dataset is split
+into chunks that each hold every class, only one chunk is read at a time (a
+FeatureStore is memory-mapped, so the rest never leaves disk) and the forest
+grows --trees-per-chunk more trees on each with warm_start. --update adds
+trees the same way to an existing model, from the samples appended to the
+dataset since it was trained, so retraining after a collection session only
+touches the new data.
+"""
+import os
+import time
 import pickle
+import argparse
 
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import numpy as np
 
+from feature_store import load_dataset
+from compiled_forest import export_forest
+from timing import peak_rss_mb
+from features import make_spec, convert_features, check_spec, default_label, parse_labels, MINSHIFT_XY, RAW_XYZ
+
+
+def stratified_chunks(labels, chunk_size, rng):
+    """Split positions 0..len(labels) into chunks of about chunk_size that each contain every class.
+
+    A warm-started forest has to see the same classes on every fit. Each
+    class's samples are shuffled and dealt over the chunks, and every chunk
+    is sorted so reads from a memory-mapped store stay sequential.
+    """
+    counts = np.bincount(labels)
+    wanted = -(-len(labels) // chunk_size)
+    n_chunks = max(1, min(wanted, counts[counts > 0].min()))
+    if n_chunks < wanted:
+        rare = int(np.flatnonzero(counts == counts[counts > 0].min())[0])
+        print(f"Warning: class {rare} has only {counts[rare]} samples, so {n_chunks} chunk(s) of about "
+              f"{-(-len(labels) // n_chunks)} samples are used instead of {wanted}")
+    parts = [[] for _ in range(n_chunks)]
+    for label in np.unique(labels):
+        rows = rng.permutation(np.flatnonzero(labels == label))
+        for chunk, part in zip(parts, np.array_split(rows, n_chunks)):
+            chunk.append(part)
+    return [np.sort(np.concatenate(chunk)) for chunk in parts]
+
+
+def read_rows(data, rows, data_spec, spec):
+    """Feature rows in the model's layout; only these rows are read from a memory-mapped store"""
+    return convert_features(np.asarray(data[rows]), data_spec, spec)
+
+
+class StreamingTrainer:
+    """Grows a random forest chunk by chunk and keeps fit/read timings"""
+
+    def __init__(self, model, data, labels, data_spec, spec):
+        self.model = model
+        self.data = data
+        self.labels = labels
+        self.data_spec = data_spec
+        self.spec = spec
+        self.fit_seconds = 0.0
+        self.read_seconds = 0.0
+        self.samples = 0
+
+    def fit(self, rows, chunk_size, trees_per_chunk, rng):
+        chunks = stratified_chunks(self.labels[rows], chunk_size, rng)
+        self.model.set_params(warm_start=True)
+        for i, chunk in enumerate(chunks):
+            started = time.perf_counter()
+            X = read_rows(self.data, rows[chunk], self.data_spec, self.spec)
+            y = self.labels[rows[chunk]]
+            self.read_seconds += time.perf_counter() - started
+
+            grown = len(getattr(self.model, 'estimators_', []))
+            self.model.set_params(n_estimators=grown + trees_per_chunk)
+            started = time.perf_counter()
+            self.model.fit(X, y)
+            self.fit_seconds += time.perf_counter() - started
+            self.samples += len(y)
+            if len(chunks) > 1:
+                print(f"Chunk {i + 1}/{len(chunks)}: {len(y)} samples, {len(self.model.estimators_)} trees")
+        self.model.set_params(warm_start=False)
+        return self.model
+
+    def evaluate(self, rows, chunk_size):
+        """Accuracy on rows, predicted a chunk at a time"""
+        correct = 0
+        for start in range(0, len(rows), chunk_size):
+            batch = rows[start:start + chunk_size]
+            predicted = self.model.predict(read_rows(self.data, batch, self.data_spec, self.spec))
+            correct += int((predicted == self.labels[batch]).sum())
+        return correct / len(rows)
+
+    def report(self):
+        rate = self.samples / self.fit_seconds if self.fit_seconds else 0.0
+        return (f"Fit {len(self.model.estimators_)} trees on {self.samples} samples in {self.fit_seconds:.2f}s "
+                f"({rate:.0f} samples/s, {self.read_seconds:.2f}s reading), peak memory {peak_rss_mb():.0f} MB")
+
+
+def holdout(rows, test_size, labels=None, seed=None):
+    """(train, test) rows; too few rows to hold any out leaves test empty"""
+    if len(rows) * test_size < 1:
+        return rows, rows[:0]
+    return train_test_split(rows, test_size=test_size, shuffle=True, random_state=seed,
+                            stratify=None if labels is None else labels[rows])
+
+
+def replay_rows(labels, rows, size, rng):
+    """Stratified sample of about `size` older rows, at least one of every class"""
+    picked = []
+    classes = np.unique(labels[rows])
+    for label in classes:
+        candidates = rows[labels[rows] == label]
+        count = min(len(candidates), max(1, size // len(classes)))
+        picked.append(rng.choice(candidates, count, replace=False))
+    return np.concatenate(picked)
+
+
+def spec_for_classes(data_spec, classes, layout=None, labels=None):
+    """The model's spec: how its inputs are built and what each class is shown as.
+
+    Models predict indices into classes, so labels are keyed by index.
+    """
+    names = {**data_spec.get('labels', {}), **(labels or {})}
+    return make_spec(layout or data_spec['layout'], data_spec['max_hands'], range(len(classes)),
+                     {str(i): names.get(name, default_label(name)) for i, name in enumerate(classes)},
+                     data_spec['normalize_scale'])
+
+
+def save_model(path, model, classes, spec, trained_samples):
+    with open(path, 'wb') as f:
+        # trained_samples marks where the next --update starts reading new samples
+        pickle.dump({'model': model, 'classes': classes, 'spec': spec, 'trained_samples': trained_samples}, f)
+
+
+def load_for_update(path, classes):
+    """(model, spec, trained_samples) of a model written by this script, checked against the dataset"""
+    with open(path, 'rb') as f:
+        model_dict = pickle.load(f)
+    model = model_dict['model']
+    if not isinstance(model, RandomForestClassifier):
+        raise ValueError(f"{path} is not a pickled RandomForestClassifier")
+    old_classes = model_dict.get('classes')
+    if old_classes is None or list(classes[:len(old_classes)]) != list(old_classes):
+        raise ValueError(f"{path} was trained on different classes; retrain without --update")
+    if len(classes) != len(old_classes):
+        raise ValueError(f"The dataset has new classes {classes[len(old_classes):]}; retrain without --update")
+    if 'spec' not in model_dict:
+        raise ValueError(f"{path} has no feature spec; retrain without --update")
+    spec = check_spec(model_dict['spec'], model.n_features_in_)
+    return model, spec, model_dict.get('trained_samples')
 
-data_dict = pickle.load(open('./data.pickle', 'rb'))
 
-data = np.asarray(data_dict['data'])
-labels = np.asarray(data_dict['labels'])
+def main():
+    parser = argparse.ArgumentParser(description="Train the landmark classifier")
+    parser.add_argument('--data', default='./data.pickle',
+                        help="Dataset pickle or FeatureStore directory")
+    parser.add_argument('--output', default=None,
+                        help="Where to write the trained model (default: model.p, or the --update model)")
+    parser.add_argument('--compiled', default=None,
+                        help="Also export a flattened, sklearn-free copy of the forest (.npz)")
+    parser.add_argument('--layout', choices=[MINSHIFT_XY, RAW_XYZ], default=None,
+                        help="Train on this feature layout, derived from the dataset's rows (default: as stored)")
+    parser.add_argument('--labels', type=parse_labels, default={},
+                        help="Override the text shown per class, e.g. 0=A,1=B,2=L")
+    parser.add_argument('--jobs', type=int, default=-1, help="Cores used to grow trees (-1 = all)")
+    parser.add_argument('--trees', type=int, default=100, help="Trees in the forest when not streaming")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Stream the dataset in chunks of about this many samples")
+    parser.add_argument('--trees-per-chunk', type=int, default=10, help="Trees added for every chunk")
+    parser.add_argument('--update', default=None, metavar='MODEL',
+                        help="Add trees to this model, trained on the samples added since it was saved")
+    parser.add_argument('--since', type=int, default=None,
+                        help="With --update: index of the first new sample (default: recorded in the model)")
+    parser.add_argument('--test-size', type=float, default=0.2, help="Share of samples held out for scoring")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
 
-x_train, x_test, y_train, y_test = train_test_split(data, labels, test_size=0.2, shuffle=True, stratify=labels)
+    rng = np.random.default_rng(args.seed)
+    data, labels, classes, data_spec = load_dataset(args.data, with_spec=True)
+    labels = np.asarray(labels)
+    all_rows = np.arange(len(labels))
 
-model = RandomForestClassifier()
+    if args.update:
+        # Only a FeatureStore is append-only; create_dataset rewrites a pickle in path order
+        if not os.path.isdir(args.data):
+            raise SystemExit("--update needs --data to be a FeatureStore directory")
+        model, spec, since = load_for_update(args.update, classes)
+        since = args.since if args.since is not None else since
+        if since is None:
+            raise SystemExit(f"{args.update} doesn't record how many samples it saw; pass --since")
+        if args.layout and args.layout != spec['layout']:
+            raise SystemExit(f"--layout {args.layout} doesn't match the model being updated ({spec['layout']})")
+        new_rows = all_rows[since:]
+        if len(new_rows) == 0:
+            print(f"No samples added since {args.update} was trained")
+            return
+        train_rows, test_rows = holdout(new_rows, args.test_size, seed=args.seed)
+        # New trees also see a slice of the older samples, so every class is present
+        train_rows = np.concatenate([train_rows, replay_rows(labels, all_rows[:since], len(train_rows), rng)])
+        trees_per_chunk = args.trees_per_chunk
+        chunk_size = args.chunk_size or len(train_rows)
+        print(f"Updating {args.update} with {len(new_rows)} new samples")
+    else:
+        spec = spec_for_classes(data_spec, classes, args.layout, args.labels)
+        model = RandomForestClassifier()
+        train_rows, test_rows = holdout(all_rows, args.test_size, labels, args.seed)
+        if args.chunk_size:
+            trees_per_chunk, chunk_size = args.trees_per_chunk, args.chunk_size
+        else:
+            trees_per_chunk, chunk_size = args.trees, len(train_rows)
+    model.set_params(n_jobs=args.jobs)
+    trainer = StreamingTrainer(model, data, labels, data_spec, spec)
+    trainer.fit(train_rows, chunk_size, trees_per_chunk, rng)
+    print(trainer.report())
 
-model.fit(x_train, y_train)
+    if len(test_rows):
+        score = trainer.evaluate(np.sort(test_rows), chunk_size)
+        print('{}% of samples were classified correctly !'.format(score * 100))
 
-y_predict = model.predict(x_test)
+    save_model(args.output or args.update or 'model.p', model, classes, spec, len(labels))
 
-score = accuracy_score(y_predict, y_test)
+    if args.compiled:
+        export_forest(model, args.compiled, spec)
+        print('Compiled forest written to {}'.format(args.compiled))
 
-print('{}% of samples were classified correctly !'.format(score * 100))
 
-f = open('model.p', 'wb')
-pickle.dump({'model': model}, f)
-f.close()
+if __name__ == "__main__":
+    main()
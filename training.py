@@ -0,0 +1,282 @@
+"""Model training for SignLanguageApp, off the GUI process.
+
+BackgroundTrainer runs train() in a child process, which extracts landmarks
+from ./data/0..25 with a MediaPipe process pool (only images that have
+neither cached nor stored landmarks), fits the random forest a few trees at
+a time with warm_start and writes model.p plus its compiled .npz. Progress
+arrives as ('progress', stage, done, total) messages; cancel() is checked between
+extraction chunks and between tree batches.
+"""
+import os
+import time
+import queue
+import pickle
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from features import (extract_features, features_from_array, load_landmarks, make_spec, convert_features,
+                      RAW_XYZ, LANDMARKS_SUFFIX)
+
+DATA_DIR = './data'
+# Landmark-only samples collected by the app (see landmark_collector.py)
+LANDMARK_STORE_PATH = './data_landmarks'
+MODEL_PATH = 'model.p'
+LANDMARK_CACHE_PATH = '.landmark_cache_xyz.pickle'
+N_LETTERS = 26
+# Features the app extracts and its models are trained on
+APP_SPEC = make_spec(RAW_XYZ, max_hands=1)
+
+# Share of the overall progress bar given to each stage
+STAGE_WEIGHTS = {'extract': 0.7, 'fit': 0.25, 'save': 0.05}
+STAGE_LABELS = {'extract': "Extracting landmarks", 'fit': "Fitting model", 'save': "Saving model"}
+
+# MediaPipe graph owned by each extraction worker
+_hands = None
+
+
+class TrainingCancelled(Exception):
+    pass
+
+
+def list_letter_images(data_dir=DATA_DIR):
+    """(image_path, letter index) for every image in data_dir/0..25"""
+    items = []
+    for i in range(N_LETTERS):
+        folder_path = os.path.join(data_dir, str(i))
+        if os.path.isdir(folder_path):
+            for img_name in sorted(os.listdir(folder_path)):
+                if not img_name.endswith(LANDMARKS_SUFFIX):
+                    items.append((os.path.join(folder_path, img_name), i))
+    return items
+
+
+def _init_extractor():
+    global _hands
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1)
+
+
+def _extract_chunk(paths):
+    import cv2
+
+    features = []
+    for path in paths:
+        img = cv2.imread(path)
+        results = None if img is None else _hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        if results is not None and results.multi_hand_landmarks:
+            features.append(extract_features(results.multi_hand_landmarks[:1], RAW_XYZ).tolist())
+        else:
+            features.append(None)
+    return features
+
+
+def extract(items, report, cancelled, workers=None, chunk_size=16):
+    """Landmark features for every image (None where no hand was found)"""
+    from landmark_cache import LandmarkCache
+
+    cache = LandmarkCache(LANDMARK_CACHE_PATH, kind='xyz')
+    features = [None] * len(items)
+    todo = []
+    for index, (path, _) in enumerate(items):
+        found, cached = cache.lookup(path)
+        if found:
+            features[index] = cached
+            continue
+        hands = load_landmarks(path)
+        if hands is None:
+            todo.append(index)
+            continue
+        # Landmarks stored by the quality gate at collection time
+        data_point = features_from_array(hands, RAW_XYZ, max_hands=1)
+        features[index] = None if data_point is None else data_point.tolist()
+        cache.store(path, features[index])
+    done = len(items) - len(todo)
+    report('extract', done, len(items))
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    if chunks:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_extractor)
+        try:
+            futures = {executor.submit(_extract_chunk, [items[i][0] for i in chunk]): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                if cancelled():
+                    raise TrainingCancelled()
+                chunk = futures[future]
+                for index, data_point in zip(chunk, future.result()):
+                    features[index] = data_point
+                    cache.store(items[index][0], data_point)
+                done += len(chunk)
+                report('extract', done, len(items))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Whatever was extracted is kept, even if training was cancelled
+            cache.save()
+
+    cache.prune([path for path, _ in items])
+    cache.save()
+    return features
+
+
+def fit(X, y, report, cancelled, n_estimators=100, step=10):
+    """Random forest grown `step` trees at a time so it can report and stop in between"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    model = RandomForestClassifier(n_estimators=min(step, n_estimators), warm_start=True, n_jobs=-1)
+    report('fit', 0, n_estimators)
+    while True:
+        if cancelled():
+            raise TrainingCancelled()
+        model.fit(X, y)
+        report('fit', model.n_estimators, n_estimators)
+        if model.n_estimators >= n_estimators:
+            break
+        model.set_params(n_estimators=min(model.n_estimators + step, n_estimators))
+    model.set_params(warm_start=False)
+    return model
+
+
+def save(model, model_path, report):
+    from startup import compiled_path
+    from compiled_forest import export_forest
+
+    report('save', 0, 1)
+    spec = make_spec(RAW_XYZ, 1, model.classes_)
+    tmp_path = model_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'model': model, 'spec': spec}, f)
+    os.replace(tmp_path, model_path)
+    # Written after the pickle so load_model_fast sees an up-to-date compiled copy
+    export_forest(model, compiled_path(model_path), spec)
+    report('save', 1, 1)
+
+
+def load_landmark_store(store_path):
+    """(X, y) from a landmark-only FeatureStore, in the app's layout, or None if there is none"""
+    import numpy as np
+    from feature_store import FeatureStore
+
+    if not os.path.isdir(store_path):
+        return None
+    store = FeatureStore(store_path)
+    # Raises if the store's rows can't be turned into the app's features
+    X = convert_features(store.features, store.spec, APP_SPEC)
+    letters = np.array([int(name) for name in store.classes])
+    return X, letters[np.asarray(store.labels)]
+
+
+def train(report, cancelled, data_dir=DATA_DIR, model_path=MODEL_PATH, workers=None, n_estimators=100,
+          store_path=LANDMARK_STORE_PATH):
+    import numpy as np
+
+    started = time.perf_counter()
+    items = list_letter_images(data_dir)
+    stored = load_landmark_store(store_path)
+    if not items and stored is None:
+        raise ValueError(f"No images found in {data_dir}")
+    features = extract(items, report, cancelled, workers) if items else []
+
+    X = np.array([data_point for data_point in features if data_point is not None]).reshape(-1, 63)
+    y = np.array([label for (_, label), data_point in zip(items, features) if data_point is not None], dtype=int)
+    if stored is not None:
+        # Landmark-only samples need no extraction at all
+        X = np.concatenate([X, stored[0]])
+        y = np.concatenate([y, stored[1]])
+    if len(set(y.tolist())) < 2:
+        raise ValueError("Need hand images for at least two letters")
+    model = fit(X, y, report, cancelled, n_estimators)
+    if cancelled():
+        raise TrainingCancelled()
+    save(model, model_path, report)
+    return {'samples': len(X), 'collected': len(items) + (0 if stored is None else len(stored[1])),
+            'letters': len(model.classes_),
+            'seconds': time.perf_counter() - started}
+
+
+def _train_process(messages, cancel_event, options):
+    def report(stage, done, total):
+        messages.put(('progress', stage, done, total))
+    try:
+        messages.put(('done', train(report, cancel_event.is_set, **options)))
+    except TrainingCancelled:
+        messages.put(('cancelled', None))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
+
+class BackgroundTrainer:
+    """Runs train() in a child process; the GUI calls poll() from its event loop"""
+
+    def __init__(self, **options):
+        # spawn: the child must not inherit the GUI's threads, Tk or MediaPipe state
+        context = multiprocessing.get_context('spawn')
+        self.messages = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(target=_train_process,
+                                       args=(self.messages, self.cancel_event, options))
+        self.state = 'idle'
+        self.stage = None
+        self.stage_done = 0
+        self.stage_total = 0
+        self.result = None
+        self.error = None
+
+    def start(self):
+        self.process.start()
+        self.state = 'running'
+        return self
+
+    def cancel(self):
+        if self.state == 'running':
+            self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.state == 'running'
+
+    def poll(self):
+        """Apply queued messages; returns the state ('running', 'done', 'cancelled' or 'error')"""
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                _, self.stage, self.stage_done, self.stage_total = message
+                continue
+            self.state = message[0]
+            if self.state == 'done':
+                self.result = message[1]
+            elif self.state == 'error':
+                self.error = message[1]
+        if self.state == 'running' and not self.process.is_alive() and self.messages.empty():
+            self.state = 'error'
+            self.error = f"Training process exited with code {self.process.exitcode}"
+        if self.state != 'running':
+            self.process.join()
+        return self.state
+
+    @property
+    def progress(self):
+        """Overall fraction done across the extract/fit/save stages"""
+        if self.stage is None:
+            return 0.0
+        stages = list(STAGE_WEIGHTS)
+        fraction = sum(STAGE_WEIGHTS[stage] for stage in stages[:stages.index(self.stage)])
+        if self.stage_total:
+            fraction += STAGE_WEIGHTS[self.stage] * self.stage_done / self.stage_total
+        return fraction
+
+    def status(self):
+        if self.state == 'done':
+            result = self.result
+            return (f"Model trained on {result['samples']} of {result['collected']} samples, "
+                    f"{result['letters']} letters, in {result['seconds']:.1f}s")
+        if self.state == 'cancelled':
+            return "Training cancelled"
+        if self.state == 'error':
+            return f"Training error: {self.error}"
+        if self.stage is None:
+            return "Starting training..."
+        if self.cancel_event.is_set():
+            return "Cancelling training..."
+        return f"{STAGE_LABELS[self.stage]}: {self.stage_done}/{self.stage_total}"
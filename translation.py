@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import queue
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+
+CACHE_PATH = '.translation_cache.pickle'
+
+# Dictionary mapping language codes to full language names
+LANGUAGES = {
+    'af': 'Afrikaans',
+    'sq': 'Albanian',
+    'ar': 'Arabic',
+    'hy': 'Armenian',
+    'bn': 'Bengali',
+    'bs': 'Bosnian',
+    'bg': 'Bulgarian',
+    'ca': 'Catalan',
+    'zh-CN': 'Chinese (Simplified)',
+    'zh-TW': 'Chinese (Traditional)',
+    'hr': 'Croatian',
+    'cs': 'Czech',
+    'da': 'Danish',
+    'nl': 'Dutch',
+    'en': 'English',
+    'eo': 'Esperanto',
+    'et': 'Estonian',
+    'fi': 'Finnish',
+    'fr': 'French',
+    'gl': 'Galician',
+    'de': 'German',
+    'el': 'Greek',
+    'gu': 'Gujarati',
+    'ht': 'Haitian Creole',
+    'ha': 'Hausa',
+    'he': 'Hebrew',
+    'hi': 'Hindi',
+    'hu': 'Hungarian',
+    'is': 'Icelandic',
+    'id': 'Indonesian',
+    'it': 'Italian',
+    'ja': 'Japanese',
+    'kn': 'Kannada',
+    'ko': 'Korean',
+    'la': 'Latin',
+    'lv': 'Latvian',
+    'lt': 'Lithuanian',
+    'mk': 'Macedonian',
+    'ms': 'Malay',
+    'ml': 'Malayalam',
+    'mr': 'Marathi',
+    'no': 'Norwegian',
+    'fa': 'Persian',
+    'pl': 'Polish',
+    'pt': 'Portuguese',
+    'pa': 'Punjabi',
+    'ro': 'Romanian',
+    'ru': 'Russian',
+    'sr': 'Serbian',
+    'sk': 'Slovak',
+    'sl': 'Slovenian',
+    'es': 'Spanish',
+    'sw': 'Swahili',
+    'sv': 'Swedish',
+    'ta': 'Tamil',
+    'te': 'Telugu',
+    'th': 'Thai',
+    'tr': 'Turkish',
+    'uk': 'Ukrainian',
+    'ur': 'Urdu',
+    'vi': 'Vietnamese',
+    'cy': 'Welsh',
+    'yi': 'Yiddish'
+}
+
+# Reverse index and menu order, built once instead of scanning LANGUAGES per lookup
+LANGUAGE_CODES = {name: code for code, name in LANGUAGES.items()}
+LANGUAGE_NAMES = sorted(LANGUAGES.values())
+
+
+def language_code(name):
+    """Language code for a display name from LANGUAGES (e.g. 'Spanish' -> 'es')"""
+    return LANGUAGE_CODES[name]
+
+
+def language_name(code):
+    return LANGUAGES[code]
+
+
+class GoogleBackend:
+    """googletrans backend; one Translator is created on first use and reused"""
+
+    def __init__(self):
+        self._translator = None
+
+    def translate_batch(self, texts, dest):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        translations = self._translator.translate(list(texts), dest=dest)
+        return [t.text for t in translations]
+
+
+class DictionaryBackend:
+    """Offline word-by-word backend from a {lang_code: {word: translation}} JSON file"""
+
+    def __init__(self, path_or_dict):
+        if isinstance(path_or_dict, dict):
+            self.dictionary = path_or_dict
+        else:
+            with open(path_or_dict, encoding='utf-8') as f:
+                self.dictionary = json.load(f)
+
+    def translate_batch(self, texts, dest):
+        words = self.dictionary.get(dest, {})
+        return [' '.join(words.get(word.lower(), word) for word in text.split()) for text in texts]
+
+
+class StubBackend:
+    """Deterministic stand-in for tests: tags the text with the target language"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def translate_batch(self, texts, dest):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return [f"[{dest}] {text}" for text in texts]
+
+
+class TranslationCache:
+    """In-memory LRU in front of an on-disk store, keyed by (text, dest)"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=2048):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.disk = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    self.disk = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self.disk = {}
+
+    def get(self, text, dest, count=True):
+        key = (text, dest)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += count
+                return self.memory[key]
+            if key in self.disk:
+                self._remember(key, self.disk[key])
+                self.hits += count
+                return self.disk[key]
+            self.misses += count
+            return None
+
+    def put(self, text, dest, translation):
+        key = (text, dest)
+        with self.lock:
+            self._remember(key, translation)
+            self.disk[key] = translation
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.path or not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.disk, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def _remember(self, key, translation):
+        self.memory[key] = translation
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+
+def _resolve(future, result=None, error=None):
+    # A future the UI already cancelled just drops its result
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class TranslationService:
+    """Asynchronous, cached and batched front-end to a translation backend.
+
+    translate() returns a Future immediately. A single worker thread collects
+    requests for up to max_wait seconds (or max_batch texts), answers what it
+    can from the cache and sends the rest to the backend as one request per
+    target language, so the UI thread never waits on the network and the
+    same text is never translated twice.
+    """
+
+    def __init__(self, backend=None, cache=None, max_batch=16, max_wait=0.05):
+        self.backend = backend if backend is not None else GoogleBackend()
+        self.cache = cache if cache is not None else TranslationCache()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.backend_calls = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def translate(self, text, dest):
+        future = Future()
+        cached = self.cache.get(text, dest)
+        if cached is not None:
+            future.set_result(cached)
+        else:
+            self._queue.put((text, dest, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+        self.cache.save()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            by_dest = {}
+            for text, dest, future in self._collect(item):
+                if future.cancelled():
+                    continue
+                by_dest.setdefault(dest, {}).setdefault(text, []).append(future)
+
+            for dest, requests in by_dest.items():
+                texts = []
+                for text, futures in requests.items():
+                    # Another request in this batch may have filled it already
+                    cached = self.cache.get(text, dest, count=False)
+                    if cached is None:
+                        texts.append(text)
+                    else:
+                        for future in futures:
+                            _resolve(future, cached)
+                if not texts:
+                    continue
+                try:
+                    self.backend_calls += 1
+                    translations = self.backend.translate_batch(texts, dest)
+                except Exception as e:
+                    for text in texts:
+                        for future in requests[text]:
+                            _resolve(future, error=e)
+                    continue
+                for text, translation in zip(texts, translations):
+                    self.cache.put(text, dest, translation)
+                    for future in requests[text]:
+                        _resolve(future, translation)
+            self.cache.save()